@@ -5,6 +5,68 @@ Defines a Dataset object. Datasets contain one or more data arrays, QC info, etc
 # Third-party
 import numpy as np
 
+# Number of grid points reduced at a time when calculating ensemble stats
+_ens_stat_block_size = 16384
+
+
+def _nanmean(array, axis=0):
+    """
+    Calculates the mean of an array over the given axis, ignoring NaNs
+
+    Unlike `np.nanmean()`, this doesn't make a copy of the array with NaNs replaced by zeros - a
+    single NaN mask is used both to mask the sum and to count the valid values.
+
+    ### Parameters
+
+    - array (array_like): float array
+    - axis (int): axis to calculate the mean over
+
+    ### Returns
+
+    - array: mean over the given axis, in at least single precision - NaN wherever all values
+      are NaN
+    """
+    valid = ~np.isnan(array)
+    # Accumulate in at least single precision, so half-precision data doesn't overflow or lose
+    # precision in the sum
+    total = np.sum(array, axis=axis, where=valid, dtype=np.result_type(array.dtype, np.float32))
+    count = np.count_nonzero(valid, axis=axis)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.divide(total, count, dtype=total.dtype)
+
+
+def _reduce_over_members(func, ens, block_size=_ens_stat_block_size):
+    """
+    Applies a reduction over the member dimension (axis 1) of an ensemble array
+
+    The reduction is done one date and one block of grid points at a time, so the temporary
+    arrays that nan-aware NumPy reductions create stay small instead of being the size of the
+    entire ensemble array.
+
+    ### Parameters
+
+    - func (function): reduction function accepting an `axis` argument (eg. `np.nanstd`)
+    - ens (array_like): ensemble array, with members along axis 1
+    - block_size (int): number of grid points (along the last axis) to reduce at a time
+
+    ### Returns
+
+    - array: ens reduced over axis 1, in at least single precision
+    """
+    ens = np.asarray(ens)
+    # Reduce in at least single precision, even if ens is stored in half precision, so reductions
+    # like `np.nanstd()` don't overflow in their intermediate values
+    dtype = np.result_type(ens.dtype, np.float32)
+    if ens.ndim < 3:
+        return func(ens.astype(dtype, copy=False), axis=1)
+    out = np.empty(ens.shape[:1] + ens.shape[2:], dtype=dtype)
+    for d in range(ens.shape[0]):
+        for i in range(0, ens.shape[-1], block_size):
+            out[d, ..., i:i + block_size] = func(
+                ens[d, ..., i:i + block_size].astype(dtype, copy=False), axis=0
+            )
+    return out
+
 
 class Dataset:
     """
@@ -15,6 +77,9 @@ class Dataset:
         self.dates_with_files_not_loaded = set()
         self.files_not_loaded = set()
         self.dates_loaded = set()
+        # Boolean array with one element per date, in the order the dates were loaded - True for
+        # dates with files not loaded (set by the loading functions)
+        self.missing_date_mask = None
 
 
 class Observation(Dataset):
@@ -23,7 +88,6 @@ class Observation(Dataset):
     """
     def __init__(self, obs=None):
         Dataset.__init__(self, data_type='observation')
-        self.data_type = 'observation'
         self.obs = obs
 
 
@@ -33,7 +97,6 @@ class Forecast(Dataset):
     """
     def __init__(self):
         Dataset.__init__(self, data_type='forecast')
-        self.data_type = 'forecast'
 
 
 class EnsembleForecast(Forecast):
@@ -46,21 +109,55 @@ class EnsembleForecast(Forecast):
         self._ens_mean = ens_mean
         self._ens_spread = ens_spread
 
+    def get_ens(self):
+        """
+        Returns the full ensemble data array
+
+        ### Returns
+
+        - array: full ensemble data array
+        """
+        return self._ens
+
+    def set_ens(self, ens):
+        """
+        Sets the full ensemble data array
+
+        Setting a new array invalidates the cached ensemble mean
+
+        ### Parameters
+
+        - ens (array_like): full ensemble data array
+        """
+        self._ens = ens
+        self.invalidate_ens_mean()
+
+    ens = property(get_ens, set_ens)
+
     def get_ens_mean(self):
         """
         Returns the ensemble mean
 
-        Since ens_mean is defined as a property which calls this method, it won't take up memory
-        by default
+        The ensemble mean is calculated the first time it's requested and cached after that, so
+        accessing the ens_mean property repeatedly doesn't recalculate it. If ens is modified in
+        place, call `invalidate_ens_mean()` so it's recalculated on the next request.
 
         ### Returns
 
         - array: ensemble mean
         """
-        return np.nanmean(self.ens, axis=1) if self._ens_mean is None else self._ens_mean
+        if self._ens_mean is None and self.ens is not None:
+            self._ens_mean = _reduce_over_members(_nanmean, self.ens)
+        return self._ens_mean
 
     ens_mean = property(get_ens_mean)
 
+    def invalidate_ens_mean(self):
+        """
+        Clears the cached ensemble mean, so it's recalculated the next time it's requested
+        """
+        self._ens_mean = None
+
     def get_ens_spread(self):
         """
         Returns the ensemble spread
@@ -72,14 +169,16 @@ class EnsembleForecast(Forecast):
 
         - array: ensemble spread
         """
-        return np.nanstd(self.ens, axis=1) if self._ens_spread is None else self._ens_spread
+        if self._ens_spread is not None:
+            return self._ens_spread
+        return _reduce_over_members(np.nanstd, self.ens)
 
     ens_spread = property(get_ens_spread)
 
 
 class DeterministicForecast(Forecast):
     """
-    Ensemble Forecast Dataset
+    Deterministic Forecast Dataset
     """
     def __init__(self, fcst=None):
         Forecast.__init__(self)
@@ -92,5 +191,4 @@ class Climatology(Dataset):
     """
     def __init__(self, climo=None):
         Dataset.__init__(self, data_type='climatology')
-        self.data_type = 'climatology'
         self.climo = climo
@@ -8,37 +8,398 @@ to make that much simpler.
 
 # Built-ins
 import os
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Third-party
 import numpy as np
 import jinja2
+import jinja2.meta
 from cpc.units.units import UnitConverter
 import xarray as xr
 from cpc.geogrids.manipulation import interpolate
 
 # This package
 from .datasets import EnsembleForecast, DeterministicForecast, Observation, Climatology
-from .reading import read_grib
+from .reading import read_bin, read_grib, read_grib_multi
 from .exceptions import LoadingError, ReadingError
 
+# Functions used to accumulate a stat over the fhr dimension, one fhr at a time
+_fhr_stat_funcs = {'mean': np.add, 'min': np.minimum, 'max': np.maximum, 'sum': np.add}
+
+# Stats load_dtrm_fcsts can take over the fhr dimension
+_dtrm_fhr_stats = frozenset({'mean', 'std'})
+
+# Data types read with wgrib/wgrib2, and read as flat binary files
+_grib_data_types = frozenset({'grib1', 'grib2'})
+_bin_data_types = frozenset({'bin', 'binary'})
+# Data types read one file at a time
+_file_data_types = _grib_data_types | _bin_data_types
+
 
 def all_int_to_str(input):
-    if all(isinstance(x, int) for x in input):
-        # Get length of longest int
-        max_length = max([len(str(x)) for x in input])
-        # Convert all ints to strings, zero-padding to the max length
-        return ['{{:0{}.0f}}'.format(max_length).format(x) for x in input]
-    elif all(isinstance(x, str) for x in input):
+    """
+    Converts a list of ints to a list of strings, zero-padded to the length of the longest int
+
+    A list of strings is returned unchanged.
+
+    Parameters
+    ----------
+
+    - input (list of ints or strings): list to convert
+
+    Returns
+    -------
+
+    - list of strings
+
+    Raises
+    ------
+
+    - ValueError: if input is not a list of all ints or all strings
+
+    Examples
+    --------
+
+        >>> from cpc.geofiles.loading import all_int_to_str
+        >>> all_int_to_str([0, 6, 12])
+        ['00', '06', '12']
+        >>> all_int_to_str(['00', '06'])
+        ['00', '06']
+    """
+    if all(isinstance(x, str) for x in input):
         return input
-    else:
+    # Mixed ints and strings end up as a string array, and anything else isn't an int array
+    array = np.asarray(input)
+    if array.dtype.kind not in 'iu':
         raise ValueError('input must be a list of ints')
+    # Get length of longest int
+    max_length = max(len(str(array.max())), len(str(array.min())))
+    # Convert all ints to strings of the max length, zero-padding them
+    return np.char.zfill(array.astype(f'U{max_length}'), max_length).tolist()
+
+
+def _split_date(date):
+    """
+    Splits a date into its components
+
+    Parameters
+    ----------
+
+    - date (string): date in YYYYMMDD or YYYYMMDDHH format - if YYYYMMDD, the hour is assumed to
+      be 00
+
+    Returns
+    -------
+
+    - yyyy, mm, dd, hh (strings): components of the date
+    """
+    return date[0:4], date[4:6], date[6:8], date[8:10] if len(date) == 10 else '00'
+
+
+def _check_grib_params(data_type, grib_var, grib_level):
+    """
+    Makes sure the grib parameters are set if the data type is grib1 or grib2
+
+    Parameters
+    ----------
+
+    - data_type (string): data type
+    - grib_var (string): grib variable name
+    - grib_level (string): grib level name
+
+    Raises
+    ------
+
+    - LoadingError: if data_type is grib1 or grib2 and grib_var or grib_level isn't given
+    """
+    if data_type in _grib_data_types and (grib_var is None or grib_level is None):
+        raise LoadingError('When data_type is grib1 or grib2, grib_var and grib_level must be '
+                           'defined')
+
+
+def _grep_fhr_patterns(fhrs, data_type):
+    """
+    Returns the pattern to grep a grib inventory for to find the record for each fhr
+
+    The patterns are anchored to the forecast time field of the inventory (eg. ':6 hour fcst:' for
+    wgrib2, or ':6hr fcst:' for wgrib), so they don't also match other parts of the inventory line,
+    like the date (eg. '12' in 'd=2016121200') or the forecast time of a longer fhr (eg. '12' in
+    '120 hour fcst'). An fhr of 0 also matches an analysis ('anl').
+
+    Parameters
+    ----------
+
+    - fhrs (list of strings or ints): fhrs
+    - data_type (string): data type (grib1 or grib2)
+
+    Returns
+    -------
+
+    - list of strings: regex for each fhr, for the `grep_fhr(s)` parameter of `read_grib()` and
+      `read_grib_multi()`
+    """
+    fcst = '{}hr fcst' if data_type == 'grib1' else '{} hour fcst'
+    return [':(anl|{}):'.format(fcst.format(0)) if int(fhr) == 0 else
+            ':{}:'.format(fcst.format(int(fhr))) for fhr in fhrs]
+
+
+def _compile_template(file_template):
+    """
+    Compiles a file template, and finds out which variables it contains
+
+    Parameters
+    ----------
+
+    - file_template (string): Jinja2 file template - environment variables in it are expanded
+      first
+
+    Returns
+    -------
+
+    - template (jinja2.Template): compiled template
+    - template_vars (set of strings): names of the variables in the template
+    """
+    template_source = os.path.expandvars(file_template)
+    template_vars = jinja2.meta.find_undeclared_variables(
+        jinja2.Environment().parse(template_source)
+    )
+    return jinja2.Template(template_source), template_vars
+
+
+def _render_fhr_files(template, template_vars, fhrs, **kwargs):
+    """
+    Renders a compiled file template for each fhr
+
+    If the template doesn't contain {fhr}, every fhr has the same file, so the template is only
+    rendered once.
+
+    Parameters
+    ----------
+
+    - template (jinja2.Template): compiled template, from `_compile_template()`
+    - template_vars (set of strings): names of the variables in the template
+    - fhrs (list of strings): fhrs to render the template for
+    - kwargs: values of the other variables in the template
+
+    Returns
+    -------
+
+    - list of strings: file for each fhr
+    """
+    if 'fhr' not in template_vars:
+        return [template.render(**kwargs)] * len(fhrs)
+    return [template.render(**kwargs, fhr=fhr) for fhr in fhrs]
+
+
+def _mean_std(rows):
+    """
+    Calculates the mean and standard deviation over a series of arrays in a single pass
+
+    Uses Welford's algorithm, so each array is only visited once, and no array containing all of
+    the rows or their deviations from the mean is ever created. The updates are done in place,
+    with two scratch arrays reused for every row. As with `np.mean()` and `np.std()`, a NaN in any
+    row makes the mean and standard deviation NaN at that point.
+
+    Parameters
+    ----------
+
+    - rows (iterable of arrays): arrays of the same shape, eg. the fhrs of a (fhrs x grid points)
+      array
+
+    Returns
+    -------
+
+    - mean (array_like): mean of the rows
+    - std (array_like): standard deviation of the rows
+    """
+    count = 0
+    mean = m2 = None
+    for row in rows:
+        count += 1
+        if mean is None:
+            mean = np.zeros(np.shape(row))
+            m2 = np.zeros_like(mean)
+            delta = np.empty_like(mean)
+            scratch = np.empty_like(mean)
+        # delta = row - mean; mean += delta / count
+        np.subtract(row, mean, out=delta)
+        mean += np.divide(delta, count, out=scratch)
+        # m2 += delta * (row - mean)
+        np.subtract(row, mean, out=scratch)
+        m2 += np.multiply(delta, scratch, out=scratch)
+    m2 /= count
+    return mean, np.sqrt(m2, out=m2)
+
+
+def _iter_fcst_fhrs(files, data_type, geogrid, files_not_loaded, grib_var=None,
+                    grib_level=None, grep_fhrs=None, yrev=False, debug=False, cache_dir=None,
+                    stop_on_missing=False):
+    """
+    Reads the data for all fhrs of a single day (and member, for ensemble forecasts) of a
+    forecast, one file at a time
+
+    Each file is only read once, even if it contains the data for more than one fhr. If
+    `grep_fhrs` is given, the record for each fhr is grepped for (with `read_grib_multi()` when
+    several fhrs share a file), otherwise every fhr sharing a file gets the same record.
+
+    Parameters
+    ----------
+
+    - files (list of strings): files to read, one per fhr
+    - data_type (string): data type (bin, grib1 or grib2)
+    - geogrid (Geogrid): Geogrid associated with the data
+    - files_not_loaded (list): list that files which couldn't be loaded are appended to
+    - grib_var (string): grib variable name (for grib files only)
+    - grib_level (string): grib level name (for grib files only)
+    - grep_fhrs (list of strings): fhr to grep each grib file for, one per fhr (default: None)
+    - yrev (boolean): whether data is reversed in the y-direction, and should be flipped when
+      loaded (default: False)
+    - debug (boolean): if True the file data is loaded from will be printed out (default: False)
+    - cache_dir (string): directory to cache decoded grib records in (default: None)
+    - stop_on_missing (boolean): if True, stop reading files and raise a ReadingError as soon as a
+      file can't be loaded (default: False)
+
+    Yields
+    ------
+
+    - (f, data) tuples, where data is the array of grid points for fhr index f, or None if its
+      file couldn't be loaded - fhrs are yielded grouped by file, so not necessarily in order
+
+    Raises
+    ------
+
+    - ReadingError: if stop_on_missing is True and a file couldn't be loaded
+    """
+    # Group the fhrs by file - if the file template doesn't contain {fhr}, all fhrs share a file
+    fhrs_by_file = {}
+    for f, file in enumerate(files):
+        fhrs_by_file.setdefault(file, []).append(f)
+    for file, f_indexes in fhrs_by_file.items():
+        # Read in data from file
+        try:
+            if data_type in _grib_data_types:
+                if grep_fhrs is not None and len(f_indexes) > 1:
+                    data = read_grib_multi(file, data_type, grib_var, grib_level, geogrid,
+                                           [grep_fhrs[f] for f in f_indexes], yrev=yrev,
+                                           debug=debug, cache_dir=cache_dir)
+                else:
+                    grep_fhr = None if grep_fhrs is None else grep_fhrs[f_indexes[0]]
+                    data = read_grib(file, data_type, grib_var, grib_level, geogrid, yrev=yrev,
+                                     grep_fhr=grep_fhr, debug=debug, cache_dir=cache_dir)
+            else:
+                data = read_bin(file, geogrid, yrev=yrev, debug=debug)
+        except ReadingError as e:
+            if debug:
+                print(f'Couldn\'t load data from file {file}: {e}')
+            files_not_loaded.append(file)
+            if stop_on_missing:
+                raise
+            data = None
+        # Every fhr sharing the file gets the same record, unless one was grepped for each
+        for i, f in enumerate(f_indexes):
+            yield f, data[i] if data is not None and data.ndim > 1 else data
+
+
+def _load_fcst_day(files, data_type, geogrid, grib_var=None, grib_level=None, grep_fhrs=None,
+                   yrev=False, debug=False, cache_dir=None, fhr_stat=None, accum_over_fhr=False,
+                   prepare_fhr=None):
+    """
+    Reads the data for all fhrs of a single day (and member, for ensemble forecasts) of a forecast,
+    and takes the stat over the fhrs
+
+    The stat is accumulated as each fhr is read, so unless `fhr_stat` is None, no array holding
+    every fhr is created - only arrays the size of a single fhr. The stat is taken in whichever
+    thread this runs in, rather than in the thread collecting the results.
+
+    Don't use nanmean/nanstd - if an fhr is missing then we don't trust this mean/std, so a
+    missing fhr makes the stat missing. Since the stat will be missing anyway, no more files are
+    read once one can't be loaded. Data accumulated over fhrs only depends on the first and last
+    fhrs, so only their files are read.
+
+    Parameters
+    ----------
+
+    - files (list of strings): files to read, one per fhr
+    - data_type (string): data type (bin, grib1 or grib2)
+    - geogrid (Geogrid): Geogrid associated with the data
+    - grib_var (string): grib variable name (for grib files only)
+    - grib_level (string): grib level name (for grib files only)
+    - grep_fhrs (list of strings): fhr to grep each grib file for, one per fhr (default: None)
+    - yrev (boolean): whether data is reversed in the y-direction, and should be flipped when
+      loaded (default: False)
+    - debug (boolean): if True the file data is loaded from will be printed out (default: False)
+    - cache_dir (string): directory to cache decoded grib records in (default: None)
+    - fhr_stat (string): stat to take over the fhrs (mean, std, min, max, sum or None [default])
+    - accum_over_fhr (boolean): whether the data is accumulated over the fhrs, in which case the
+      sum over the fhrs is the last fhr minus the first fhr (default: False)
+    - prepare_fhr (function): function applied to each fhr's data (eg. a unit conversion) before
+      the stat is taken (default: None)
+
+    Returns
+    -------
+
+    - data (array_like): data array of shape (grid points), or (fhrs x grid points) if fhr_stat is
+      None - fhrs that couldn't be loaded are set to missing
+    - files_not_loaded (list of strings): files that couldn't be loaded - if the stat is missing
+      because of a file that couldn't be loaded, the files after it aren't read or included
+    """
+    files_not_loaded = []
+    accum = fhr_stat == 'sum' and accum_over_fhr
+    if accum:
+        # Only the first and last fhrs are needed for data accumulated over the fhrs, so the
+        # files in between aren't read
+        files = [files[0], files[-1]]
+        if grep_fhrs is not None:
+            grep_fhrs = [grep_fhrs[0], grep_fhrs[-1]]
+    fhr_data = _iter_fcst_fhrs(files, data_type, geogrid, files_not_loaded, grib_var=grib_var,
+                               grib_level=grib_level, grep_fhrs=grep_fhrs, yrev=yrev,
+                               debug=debug, cache_dir=cache_dir,
+                               stop_on_missing=fhr_stat is not None and not accum)
+    if prepare_fhr is not None:
+        fhr_data = ((f, None if data is None else prepare_fhr(data)) for f, data in fhr_data)
+    if fhr_stat is None:
+        data = np.full((len(files), geogrid.num_y * geogrid.num_x), np.nan, dtype=np.float32)
+        for f, data_fhr in fhr_data:
+            # fhrs that couldn't be loaded are left missing
+            if data_fhr is not None:
+                data[f] = data_fhr
+    elif accum:
+        ends = dict(fhr_data)
+        if ends[0] is None or ends[1] is None:
+            data = np.full(geogrid.num_y * geogrid.num_x, np.nan, dtype=np.float32)
+        else:
+            data = ends[1] - ends[0]
+    else:
+        try:
+            if fhr_stat == 'std':
+                data = _mean_std(data_fhr for f, data_fhr in fhr_data)[1]
+            elif len(files) == 1:
+                # The stat over a single fhr is just that fhr
+                data = next(fhr_data)[1]
+            else:
+                # Accumulate sums in double precision, and min/max in the precision of the data
+                func = _fhr_stat_funcs[fhr_stat]
+                data = None
+                for f, data_fhr in fhr_data:
+                    if data is None:
+                        data = data_fhr.astype(np.float64 if func is np.add else np.float32)
+                    else:
+                        func(data, data_fhr, out=data)
+                if fhr_stat == 'mean':
+                    data /= len(files)
+        except ReadingError:
+            # A file couldn't be loaded, so the stat is missing
+            data = np.full(geogrid.num_y * geogrid.num_x, np.nan, dtype=np.float32)
+    return data, files_not_loaded
 
 
 def load_ens_fcsts(issued_dates, fhrs, members, file_template, data_type, geogrid,
                    fhr_stat='mean', yrev=False, grib_var=None, grib_level=None,
                    remove_dup_grib_fhrs=False, unit_conversion=None, log=False, transform=None,
                    debug=False, accum_over_fhr=False, nc_var=None, one_spatial_dimension=False,
-                   interp_grid=None):
+                   interp_grid=None, num_workers=None, cache_dir=None, out_file=None,
+                   dtype=np.float32):
     """
     Loads ensemble forecast data
 
@@ -55,6 +416,11 @@ def load_ens_fcsts(issued_dates, fhrs, members, file_template, data_type, geogri
     Within a loop over the dates, fhrs and members, the bracketed variables above are replaced
     with the appropriate value.
 
+    Data is read when this is called, but only the files for the given dates, fhrs and members
+    are read - to work with a subset of a larger ensemble, load just that subset. Loads of
+    overlapping subsets can reuse decoded grib records with `cache_dir`, and `out_file` keeps
+    ensembles too large for memory on disk.
+
     Parameters
     ----------
 
@@ -66,17 +432,19 @@ def load_ens_fcsts(issued_dates, fhrs, members, file_template, data_type, geogri
       fhr and member
     - data_type (string): data type (bin, grib1 or grib2)
     - geogrid (Geogrid): Geogrid associated with the data
-    - fhr_stat (string): statistic to calculate over the forecast hour dimension (mean [default]
-      or sum)
+    - fhr_stat (string): statistic to calculate over the forecast hour dimension (mean [default],
+      min, max, sum, or None to keep every fhr)
     - yrev (boolean): whether fcst data is reversed in the y-direction, and should be flipped
       when loaded (default: False)
     - grib_var (string): grib variable name (for grib files only)
     - grib_level (string): grib level name (for grib files only)
     - remove_dup_grib_fhrs (boolean): whether to remove potential duplicate fhrs from the grib
-      files (default: False) - sets the `grep_fhr` parameter to the current fhr when calling
-      `read_grib()`, which greps for the fhr in the given grib file - this is useful for gribs
-      that may for some reason have duplicate records for a given variable but with different
-      fhrs. This way you can get the record for the correct fhr.
+      files (default: False) - sets the `grep_fhr` parameter to the forecast time of the current
+      fhr (eg. ':6 hour fcst:') when calling `read_grib()`, which greps for it in the given grib
+      file - this is useful for gribs that may for some reason have duplicate records for a given
+      variable but with different fhrs. This way you can get the record for the correct fhr. When
+      several fhrs share a file, the file is only read once, with `read_grib_multi()`, to get all
+      of their records.
     - unit_conversion - *string* (optional) - type of unit conversion to perform. If None,
       then no unit conversion will be performed.
     - log - *boolean* (optional, deprecated - use transform='log') - take the log of the forecast
@@ -89,11 +457,36 @@ def load_ens_fcsts(issued_dates, fhrs, members, file_template, data_type, geogri
       to that given fhr) - in this case the field total from fhr1 to fhr2 is field_fhr2 - field_fhr1
     - nc_var (string): NetCDF variable name (optional)
     - interp_grid (string): Name of the Geogrid you with to interpolate to before returning
+    - num_workers (int): maximum number of threads used to read grib and binary files
+      concurrently - each thread also takes the stat over fhrs for the day and member it reads,
+      so the reductions are spread over the same threads - grib records are decoded by wgrib or
+      wgrib2 child processes, so up to num_workers records are decoded in parallel even though
+      threads are used - if None, the `concurrent.futures.ThreadPoolExecutor` default is used
+      (default: None)
+    - cache_dir (string): directory to cache decoded grib records in - subsequent loads of the
+      same records read the cached data instead of decoding the grib files again (default: None)
+    - out_file (string): .npy file to store the full ensemble data array in - if set, dataset.ens
+      is a memory-mapped array backed by this file rather than an array held in memory, so data
+      larger than the available memory can be loaded. The file can be opened again later with
+      `np.load(out_file, mmap_mode='r')` (default: None)
+    - dtype (data-type): data type of the full ensemble data array (default: np.float32) - eg.
+      np.float16 halves the memory (and the memory bandwidth used to calculate the ensemble mean)
+      at the cost of precision (about 3 significant digits, and a maximum value of 65504)
 
     Returns
     -------
 
-    - EnsembleForecast object containing the forecast data and some QC data
+    - EnsembleForecast object containing the forecast data and some QC data - when a stat is
+      taken over fhrs, the remaining files for a day and member aren't read once one can't be
+      loaded, since the stat is missing anyway, so only the first such file for each day and
+      member is in `files_not_loaded` (for a sum of data accumulated over fhrs, only the files
+      for the first and last fhrs are read at all)
+
+    Raises
+    ------
+
+    - LoadingError: if fhr_stat is not supported, or data_type is grib1 or grib2 and grib_var or
+      grib_level isn't given
 
     Examples
     --------
@@ -137,6 +530,17 @@ def load_ens_fcsts(issued_dates, fhrs, members, file_template, data_type, geogri
         >>> print(dataset.ens_mean[:, 0])  # doctest: +SKIP
         [ 246.67957157  246.33497583  246.28476225]
     """
+    # ----------------------------------------------------------------------------------------------
+    # Make sure fhr_stat is supported before reading any files
+    #
+    if fhr_stat is not None and fhr_stat not in _fhr_stat_funcs:
+        raise LoadingError(f'fhr_stat must be mean, min, max, sum, or None, not {fhr_stat!r}')
+
+    # ----------------------------------------------------------------------------------------------
+    # Make sure grib parameters are set if data_type is grib1 or grib2
+    #
+    _check_grib_params(data_type, grib_var, grib_level)
+
     # ----------------------------------------------------------------------------------------------
     # Create a new EnsembleForecast Dataset
     #
@@ -146,6 +550,7 @@ def load_ens_fcsts(issued_dates, fhrs, members, file_template, data_type, geogri
     # Set dates loaded
     #
     dataset.dates_loaded |= set(issued_dates)
+    dataset.missing_date_mask = np.zeros(len(issued_dates), dtype=bool)
 
     # ----------------------------------------------------------------------------------------------
     # Create a UnitConverter object to convert the data units (if necessary) later on
@@ -156,29 +561,31 @@ def load_ens_fcsts(issued_dates, fhrs, members, file_template, data_type, geogri
     # ----------------------------------------------------------------------------------------------
     # Initialize arrays for the EnsembleForecast Dataset the full ensemble data array
     #
-    if data_type in ('grib1', 'grib2'):
+    # Grib files are float32, so the array is float32 by default as well to halve its memory
+    # footprint
+    #
+    if data_type in _file_data_types:
         if fhr_stat is None:
-            dataset.ens = np.nan * np.empty(
-                (len(fhrs), len(issued_dates), len(members), geogrid.num_y * geogrid.num_x)
-            )
+            shape = (len(fhrs), len(issued_dates), len(members), geogrid.num_y * geogrid.num_x)
         else:
-            dataset.ens = np.nan * np.empty(
-                (len(issued_dates), len(members), geogrid.num_y * geogrid.num_x)
-            )
+            shape = (len(issued_dates), len(members), geogrid.num_y * geogrid.num_x)
     else:
         if fhr_stat is None:
-            dataset.ens = np.nan * np.empty(
-                (len(fhrs), len(issued_dates), len(members), geogrid.num_y, geogrid.num_x)
-            )
+            shape = (len(fhrs), len(issued_dates), len(members), geogrid.num_y, geogrid.num_x)
         else:
-            dataset.ens = np.nan * np.empty(
-                (len(issued_dates), len(members), geogrid.num_y, geogrid.num_x)
-            )
+            shape = (len(issued_dates), len(members), geogrid.num_y, geogrid.num_x)
+    if out_file is None:
+        dataset.ens = np.full(shape, np.nan, dtype=dtype)
+    else:
+        # Store the array in a .npy file instead of in memory - data is written to the file as
+        # it's loaded
+        dataset.ens = np.lib.format.open_memmap(out_file, mode='w+', dtype=dtype, shape=shape)
+        dataset.ens[:] = np.nan
 
     # ----------------------------------------------------------------------------------------------
-    # Grib-specific setup
+    # Grib/binary-specific setup
     #
-    if data_type in ('grib1', 'grib2'):
+    if data_type in _file_data_types:
         # ----------------------------------------------------------------------------------------------
         # Convert fhrs and members to strings (if necessary)
         #
@@ -186,100 +593,93 @@ def load_ens_fcsts(issued_dates, fhrs, members, file_template, data_type, geogri
         members = all_int_to_str(members)
 
     # ----------------------------------------------------------------------------------------------
-    # Loop over date, members, and fhrs
+    # Compile the file template once - it's rendered for every file below - and find out which
+    # variables it contains
     #
-    for d, date in enumerate(issued_dates):
-        # ------------------------------------------------------------------------------------------
-        # Grib-specific looping and data loading
-        #
-        if data_type in ('grib1', 'grib2'):
-            # Split date into components
-            yyyy, mm, dd = date[0:4], date[4:6], date[6:8]
-            if len(date) == 10:
-                cc = date[8:10]
-            else:
-                cc = '00'
-            for m, member in enumerate(members):
-                # Initialize an array for a single day, single member, all fhrs
-                data_f = np.nan * np.empty((len(fhrs), geogrid.num_y * geogrid.num_x))
-                for f, fhr in enumerate(fhrs):
-                    # Replace variables in file template
-                    kwargs = {
-                        'yyyy': yyyy, 'mm': mm, 'dd': dd, 'cc': cc, 'cycle': f'{cc}z', 'cycle_num': cc,
-                        'fhr': fhr, 'member': member
-                    }
-                    file = jinja2.Template(os.path.expandvars(file_template)).render(**kwargs)
-                    # Read in data from file
-                    if data_type in ('grib1', 'grib2'):
-                        try:
-                            data_f[f] = read_grib(file, data_type, grib_var, grib_level, geogrid,
-                                                  yrev=yrev, debug=debug)
-                        except ReadingError:
-                            # Set this day to missing
-                            data_f[f] = np.full((geogrid.num_y * geogrid.num_x), np.nan)
-                            # Add this date to the list of dates with files not loaded
-                            dataset.dates_with_files_not_loaded.add(date)
-                            # Add this file to the list of files not loaded
-                            dataset.files_not_loaded.add(file)
-                    elif data_type in ['bin', 'binary']:
-                        try:
-                            if debug:
-                                print(f'Attempting to load data from {file}...')
-                            data_f[f] = np.fromfile(file, dtype='float32')
-                            # --------------------------------------------------------------------------
-                            # Flip in the y-direction if necessary
-                            if yrev:
-                                # Reshape into 2 dimensions
-                                data_temp = np.reshape(data_f[f], (geogrid.num_y, geogrid.num_x))
-                                # Flip
-                                data_temp = np.flipud(data_temp)
-                                # Reshape back into 1 dimension
-                                data_temp = np.reshape(data_temp, data_f[f].size)
-                                # Replace data_f[f]
-                                data_f[f] = data_temp
-                        except Exception as e:
-                            if debug:
-                                print(f'Couldn\'t load data from file {file}: {e}')
-                            # Set this day to missing
-                            data_f[f] = np.full((geogrid.num_y * geogrid.num_x), np.nan)
-                            # Add this date to the list of dates with files not loaded
-                            dataset.dates_with_files_not_loaded.add(date)
-                            # Add this file to the list of files not loaded
-                            dataset.files_not_loaded.add(file)
-                # ------------------------------------------------------------------------------------------------------
-                # Take stat over fhr (don't use nanmean/nanstd, if an fhr is missing then we don't trust this mean/std
-                #
-                # Note: we only do this for gribs. With xarray we average/summed over fhr above for NetCDF files
-                #
-                if data_type in ('grib1', 'grib2'):
-                    if fhr_stat == 'mean':
-                        dataset.ens[d, m] = np.mean(data_f, axis=0)
-                    elif fhr_stat == 'min':
-                        dataset.ens[d, m] = np.min(data_f, axis=0)
-                    elif fhr_stat == 'max':
-                        dataset.ens[d, m] = np.max(data_f, axis=0)
-                    elif fhr_stat == 'sum':
-                        if accum_over_fhr:
-                            dataset.ens[d, m] = data_f[-1] - data_f[0]
-                        else:
-                            dataset.ens[d, m] = np.sum(data_f, axis=0)
-                    elif fhr_stat is None:
-                        dataset.ens[:, d, m] = data_f
+    template, template_vars = _compile_template(file_template)
+
+    # ----------------------------------------------------------------------------------------------
+    # Grib/binary-specific looping and data loading
+    #
+    # Each day/member is read in a separate thread, so the latency of reading many files is
+    # overlapped. The stat over fhr is accumulated in the same thread as the files are read, so
+    # the reductions run concurrently too (NumPy releases the GIL while reducing) and the main
+    # thread only has to copy the results into the Dataset.
+    #
+    # Note: we only take the stat over fhr here for gribs and binary files. With xarray we
+    # average/summed over fhr below for NetCDF files
+    #
+    if data_type in _file_data_types:
+        # Track which files weren't loaded, and add them to the Dataset after all reads are done
+        files_not_loaded = []
+        # Everything but the files is the same for every day and member
+        if remove_dup_grib_fhrs and data_type in _grib_data_types:
+            grep_fhrs = _grep_fhr_patterns(fhrs, data_type)
+        else:
+            grep_fhrs = None
+        load_member_day = functools.partial(
+            _load_fcst_day, data_type=data_type, geogrid=geogrid, grib_var=grib_var,
+            grib_level=grib_level, grep_fhrs=grep_fhrs, yrev=yrev, debug=debug,
+            cache_dir=cache_dir, fhr_stat=fhr_stat, accum_over_fhr=accum_over_fhr
+        )
+        # Threads rather than processes - the CPU-bound grib decoding already runs in wgrib/wgrib2
+        # child processes, and the threads only wait on their output and do NumPy reductions
+        # (which release the GIL), so a process pool would only add the cost of transferring the
+        # data back
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            futures = {}
+            for d, date in enumerate(issued_dates):
+                # Split date into components
+                yyyy, mm, dd, cc = _split_date(date)
+                date_vars = {
+                    'yyyy': yyyy, 'mm': mm, 'dd': dd, 'cc': cc, 'cycle': f'{cc}z', 'cycle_num': cc
+                }
+                # If the file template doesn't contain {member}, every member would read the same
+                # files, so only read the first member and copy it to the rest below
+                for m, member in enumerate(members if 'member' in template_vars else members[:1]):
+                    # Replace variables in file template for all fhrs of this day and member
+                    files = _render_fhr_files(template, template_vars, fhrs, **date_vars,
+                                              member=member)
+                    futures[executor.submit(load_member_day, files)] = (d, m)
+            for future in as_completed(futures):
+                # Remove the future as it's consumed so its data can be freed
+                d, m = futures.pop(future)
+                data, member_day_files_not_loaded = future.result()
+                if member_day_files_not_loaded:
+                    dataset.missing_date_mask[d] = True
+                    files_not_loaded.extend(member_day_files_not_loaded)
+                for m in ([m] if 'member' in template_vars else range(len(members))):
+                    if fhr_stat is None:
+                        dataset.ens[:, d, m] = data
                     else:
-                        raise LoadingError('fhr_stat must be mean, sum, or None', file)
-        elif data_type == 'netcdf':
-            yyyy, mm, dd = date[0:4], date[4:6], date[6:8]
-            cc = date[8:10] if len(date) == 10 else '00'
-            kwargs = {'yyyy': yyyy, 'mm': mm, 'dd': dd, 'cc': cc, 'cycle': f'{cc}z', 'cycle_num': cc}
-            file = jinja2.Template(os.path.expandvars(file_template)).render(**kwargs)
+                        dataset.ens[d, m] = data
+        # Add the dates and files not loaded to the Dataset
+        dataset.dates_with_files_not_loaded.update(
+            issued_dates[d] for d in np.flatnonzero(dataset.missing_date_mask)
+        )
+        dataset.files_not_loaded.update(files_not_loaded)
+    # ----------------------------------------------------------------------------------------------
+    # NetCDF-specific looping and data loading
+    #
+    elif data_type == 'netcdf':
+        for d, date in enumerate(issued_dates):
+            yyyy, mm, dd, cc = _split_date(date)
+            date_vars = {
+                'yyyy': yyyy, 'mm': mm, 'dd': dd, 'cc': cc, 'cycle': f'{cc}z', 'cycle_num': cc
+            }
+            file = template.render(**date_vars)
             try:
                 xr_dataset = xr.open_dataset(file, decode_times=False)
             except FileNotFoundError as e:
                 print(f"Couldn't load data from file {file}: {e}")
                 # Add this date to the list of dates with files not loaded
+                dataset.missing_date_mask[d] = True
                 dataset.dates_with_files_not_loaded.add(date)
                 # Add this file to the list of files not loaded
                 dataset.files_not_loaded.add(file)
+                # Make sure the data loaded so far has been written to out_file
+                if out_file is not None:
+                    dataset.ens.flush()
                 return dataset
 
             xr_dataset = xr_dataset[nc_var].sel(time=np.in1d(xr_dataset[nc_var].time, [int(f) for f in fhrs]))
@@ -304,32 +704,32 @@ def load_ens_fcsts(issued_dates, fhrs, members, file_template, data_type, geogri
             if interp_grid is not None:
                 dataset.ens - interpolate(dataset.ens, geogrid, interp_grid)
 
-        # --------------------------------------------------------------------------------------
-        # Convert units (if necessary)
-        #
-        if unit_conversion:
-            # If the unit_conversion is 'prate-to-mm' then we have to convert the data by
-            # multiplying by the number of seconds between each fhr (eg. 86400 for 24-hour
-            # files)
-            if unit_conversion == 'prate-to-mm':
-                if len(fhrs) < 2:
-                    raise ValueError(f'Cannot apply a unit conversion of {unit_conversion} with'
-                                     f' only a single fhr')
-                else:
-                    dataset.ens *= (int(fhrs[1]) - int(fhrs[0])) * 3600
-            else:
-                dataset.ens = uc.convert(dataset.ens, unit_conversion)
-
-        # --------------------------------------------------------------------------------------
-        # Do data transformation (if necessary)
-        #
+    # ----------------------------------------------------------------------------------------------
+    # Convert units and do data transformation (if necessary)
+    #
+    # This is done in place one slab (first dimension) at a time, so no temporary arrays the size
+    # of the entire dataset are created, and a file-backed array (see out_file) stays file-backed.
+    #
+    if unit_conversion == 'prate-to-mm':
+        # If the unit_conversion is 'prate-to-mm' then we have to convert the data by
+        # multiplying by the number of seconds between each fhr (eg. 86400 for 24-hour
+        # files)
+        if len(fhrs) < 2:
+            raise ValueError(f'Cannot apply a unit conversion of {unit_conversion} with'
+                             f' only a single fhr')
+        else:
+            dataset.ens *= (int(fhrs[1]) - int(fhrs[0])) * 3600
+    for slab in dataset.ens:
+        # Convert units
+        if unit_conversion and unit_conversion != 'prate-to-mm':
+            slab[...] = uc.convert(slab, unit_conversion)
         # Assuming a minimum log value of -2, set vals of < 1mm to 0.14 (exp(-2))
         if transform == 'log' or log:
             with np.errstate(divide='ignore', invalid='ignore'):
-                dataset.ens = np.log(np.where(dataset.ens < 1, np.exp(-2), dataset.ens))
+                slab[...] = np.log(np.where(slab < 1, np.exp(-2), slab))
         elif transform == 'square-root':
-            with np.errstate(divide='ignore'):
-                dataset.ens = np.sqrt(dataset.ens)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                np.sqrt(slab, out=slab)
 
     # --------------------------------------------------------------------------------------
     # Reshape data back to 1 dimension of space
@@ -340,12 +740,17 @@ def load_ens_fcsts(issued_dates, fhrs, members, file_template, data_type, geogri
         elif one_spatial_dimension and dataset.ens.ndim == 5:
             dataset.ens = dataset.ens.reshape(dataset.ens.shape[0], dataset.ens.shape[1], dataset.ens.shape[2], -1)
 
+    # Make sure all data has been written to out_file
+    if out_file is not None:
+        dataset.ens.flush()
+
     return dataset
 
 
 def load_dtrm_fcsts(issued_dates, fhrs, file_template, data_type, geogrid, fhr_stat='mean',
                     yrev=False, grib_var=None, grib_level=None, remove_dup_grib_fhrs=False,
-                    unit_conversion=None, log=False, transform=None, debug=False):
+                    unit_conversion=None, log=False, transform=None, debug=False,
+                    num_workers=None):
     """
     Loads deterministic forecast data
 
@@ -372,16 +777,18 @@ def load_dtrm_fcsts(issued_dates, fhrs, file_template, data_type, geogrid, fhr_s
     - data_type (string): data type (bin, grib1 or grib2)
     - geogrid (Geogrid): Geogrid associated with the data
     - fhr_stat (string): statistic to calculate over the forecast hour dimension (mean [default]
-      or sum)
+      or std)
     - yrev (boolean): whether fcst data is reversed in the y-direction, and should be flipped
       when loaded (default: False)
     - grib_var (string): grib variable name (for grib files only)
     - grib_level (string): grib level name (for grib files only)
     - remove_dup_grib_fhrs (boolean): whether to remove potential duplicate fhrs from the grib
-      files (default: False) - sets the `grep_fhr` parameter to the current fhr when calling
-      `read_grib()`, which greps for the fhr in the given grib file - this is useful for gribs
-      that may for some reason have duplicate records for a given variable but with different
-      fhrs. This way you can get the record for the correct fhr.
+      files (default: False) - sets the `grep_fhr` parameter to the forecast time of the current
+      fhr (eg. ':6 hour fcst:') when calling `read_grib()`, which greps for it in the given grib
+      file - this is useful for gribs that may for some reason have duplicate records for a given
+      variable but with different fhrs. This way you can get the record for the correct fhr. When
+      several fhrs share a file, the file is only read once, with `read_grib_multi()`, to get all
+      of their records.
     - unit_conversion - *string* (optional) - type of unit conversion to perform. If None,
       then no unit conversion will be performed.
     - log - *boolean* (optional, deprecated - use transform='log') - take the log of the forecast
@@ -389,11 +796,23 @@ def load_dtrm_fcsts(issued_dates, fhrs, file_template, data_type, geogrid, fhr_s
     - transform - *string* (optional) - type of data transform to do (supported values: 'log',
       'sqare-root', None [default])
     - debug (boolean): if True the file data is loaded from will be printed out (default: False)
+    - num_workers (int): maximum number of threads used to read files concurrently - each thread
+      also converts the data and takes the stat over fhrs for the day it reads, so that work is
+      spread over the same threads - if None, the `concurrent.futures.ThreadPoolExecutor`
+      default is used (default: None)
 
     Returns
     -------
 
-    - DeterministicForecast object containing the forecast data and some QC data
+    - DeterministicForecast object containing the forecast data and some QC data - the remaining
+      files for a day aren't read once one can't be loaded, since the stat over fhrs is missing
+      anyway, so only the first such file for each day is in `files_not_loaded`
+
+    Raises
+    ------
+
+    - LoadingError: if fhr_stat is not supported, or data_type is grib1 or grib2 and grib_var or
+      grib_level isn't given
 
     Examples
     --------
@@ -416,12 +835,16 @@ def load_dtrm_fcsts(issued_dates, fhrs, file_template, data_type, geogrid, fhr_s
         >>> print(dataset.fcst.shape, dataset.fcst[:, 0])  # doctest: +SKIP
         (3, 259920) [ 246.64699936  246.50599976  245.97450104]
     """
+    # ----------------------------------------------------------------------------------------------
+    # Make sure fhr_stat is supported before reading any files
+    #
+    if fhr_stat not in _dtrm_fhr_stats:
+        raise LoadingError(f'fhr_stat must be either mean or std, not {fhr_stat!r}')
+
     # ----------------------------------------------------------------------------------------------
     # Make sure grib parameters are set if data_type is grib1 or grib2
     #
-    if data_type in ('grib1', 'grib2'):
-        if grib_var is None or grib_level is None:
-            raise LoadingError('When data_type is grib1 or grib2, grib_var and grib_level must be defined')
+    _check_grib_params(data_type, grib_var, grib_level)
 
     # ----------------------------------------------------------------------------------------------
     # Create a new DeterministicForecast Dataset
@@ -431,7 +854,10 @@ def load_dtrm_fcsts(issued_dates, fhrs, file_template, data_type, geogrid, fhr_s
     # ----------------------------------------------------------------------------------------------
     # Initialize array for the DeterministicForecast Dataset
     #
-    dataset.fcst = np.nan * np.empty((len(issued_dates), geogrid.num_y * geogrid.num_x))
+    # Data is stored in single precision, since that's what it's read in as
+    #
+    dataset.fcst = np.full((len(issued_dates), geogrid.num_y * geogrid.num_x), np.nan,
+                           dtype=np.float32)
 
     # ----------------------------------------------------------------------------------------------
     # Convert fhrs to strings (if necessary)
@@ -442,6 +868,7 @@ def load_dtrm_fcsts(issued_dates, fhrs, file_template, data_type, geogrid, fhr_s
     # Set dates loaded
     #
     dataset.dates_loaded |= set(issued_dates)
+    dataset.missing_date_mask = np.zeros(len(issued_dates), dtype=bool)
 
     # ----------------------------------------------------------------------------------------------
     # Create a UnitConverter object to convert the data units (if necessary) later on
@@ -450,64 +877,107 @@ def load_dtrm_fcsts(issued_dates, fhrs, file_template, data_type, geogrid, fhr_s
         uc = UnitConverter()
 
     # ----------------------------------------------------------------------------------------------
-    # Loop over date and fhrs
+    # Convert units and do data transformation (if necessary) - this is done to each fhr as it's
+    # read, before the stat over fhr is taken
     #
-    for d, date in enumerate(issued_dates):
-        # Split date into components
-        yyyy, mm, dd = date[0:4], date[4:6], date[6:8]
-        if len(date) == 10:
-            cc = date[8:10]
-        else:
-            cc = '00'
-        # Initialize an array for a single day, all fhrs
-        data_f = np.nan * np.empty((len(fhrs), geogrid.num_y * geogrid.num_x))
-        for f, fhr in enumerate(fhrs):
-            # Replace variables in file template
-            kwargs = {'yyyy': yyyy, 'mm': mm, 'dd': dd, 'cc': cc, 'fhr': fhr}
-            file = jinja2.Template(os.path.expandvars(file_template)).render(**kwargs)
-            # Read in data from file
-            if data_type in ('grib1', 'grib2'):
-                try:
-                    data_f[f] = read_grib(file, data_type, grib_var, grib_level, geogrid, yrev=yrev,
-                                          debug=debug)
-                except ReadingError:
-                    # Set this day to missing
-                    data_f[f] = np.full((geogrid.num_y * geogrid.num_x), np.nan)
-                    # Add this date to the list of dates with files not loaded
-                    dataset.dates_with_files_not_loaded.add(date)
-                    # Add this file to the list of files not loaded
-                    dataset.files_not_loaded.add(file)
-        # --------------------------------------------------------------------------------------
+    def prepare_fhr(data):
         # Convert units (if necessary)
-        #
         if unit_conversion:
-            data_f = uc.convert(data_f, unit_conversion)
-        # --------------------------------------------------------------------------------------
+            data = uc.convert(data, unit_conversion)
         # Do data transformation (if necessary)
         #
         # Assuming a minimum log value of -2, set vals of < 1mm to 0.14 (exp(-2))
         if transform == 'log' or log:
             with np.errstate(divide='ignore', invalid='ignore'):
-                data_f = np.log(np.where(data_f < 1, np.exp(-2), data_f))
+                data = np.log(np.where(data < 1, np.exp(-2), data))
         elif transform == 'square-root':
             with np.errstate(divide='ignore'):
-                dataset.ens = np.sqrt(dataset.ens)
-
-        # Take stat over fhr (don't use nanmean/nanstd, if an fhr is missing then we
-        # don't trust this mean/std
-        if fhr_stat == 'mean':
-            dataset.fcst[d] = np.mean(data_f, axis=0)
-        elif fhr_stat == 'std':
-            dataset.fcst[d] = np.std(data_f, axis=0)
-        else:
-            raise LoadingError('fhr_stat must be either mean or std', file)
+                data = np.sqrt(data)
+        return data
+
+    # ----------------------------------------------------------------------------------------------
+    # Loop over date and fhrs
+    #
+    # Each day is read in a separate thread, so the latency of reading many files is overlapped.
+    # The stat over fhr is accumulated in the same thread as the fhrs are read.
+    #
+    # The file template is compiled once, and rendered for every file
+    #
+    template, template_vars = _compile_template(file_template)
+    if remove_dup_grib_fhrs and data_type in _grib_data_types:
+        grep_fhrs = _grep_fhr_patterns(fhrs, data_type)
+    else:
+        grep_fhrs = None
+    load_day = functools.partial(
+        _load_fcst_day, data_type=data_type, geogrid=geogrid, grib_var=grib_var,
+        grib_level=grib_level, grep_fhrs=grep_fhrs, yrev=yrev, debug=debug, fhr_stat=fhr_stat,
+        prepare_fhr=prepare_fhr if unit_conversion or transform or log else None
+    )
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        futures = {}
+        for d, date in enumerate(issued_dates):
+            # Split date into components
+            yyyy, mm, dd, cc = _split_date(date)
+            date_vars = {'yyyy': yyyy, 'mm': mm, 'dd': dd, 'cc': cc}
+            # Replace variables in file template for all fhrs of this day
+            files = _render_fhr_files(template, template_vars, fhrs, **date_vars)
+            futures[executor.submit(load_day, files)] = d
+        for future in as_completed(futures):
+            # Remove the future as it's consumed so its data can be freed
+            d = futures.pop(future)
+            dataset.fcst[d], day_files_not_loaded = future.result()
+            if day_files_not_loaded:
+                # Mark this date as having files not loaded
+                dataset.missing_date_mask[d] = True
+                # Add these files to the list of files not loaded
+                dataset.files_not_loaded.update(day_files_not_loaded)
+    # Add the dates not loaded to the Dataset
+    dataset.dates_with_files_not_loaded.update(
+        issued_dates[d] for d in np.flatnonzero(dataset.missing_date_mask)
+    )
 
     return dataset
 
 
+def _load_obs_day(file, out, data_type, geogrid, record_num=None, yrev=False, grib_var=None,
+                  grib_level=None, debug=False, wgrib2_new_grid=False):
+    """
+    Reads the observation data for a single date into an existing array
+
+    Parameters
+    ----------
+
+    - file (string): file to read
+    - out (array_like): contiguous float32 array of shape (grid points) to put the data in - it
+      may be partly overwritten if the data couldn't be read
+    - data_type (string): data type (bin, grib1 or grib2)
+    - geogrid (Geogrid): Geogrid associated with the data
+    - record_num (int): binary record containing the desired variable - if None then the file is
+      assumed to be a single record (default)
+    - yrev (boolean): whether grib data is reversed in the y-direction, and should be flipped when
+      loaded (default: False)
+    - grib_var (string): grib variable name (for grib files only)
+    - grib_level (string): grib level name (for grib files only)
+    - debug (boolean): if True the file data is loaded from will be printed out (default: False)
+    - wgrib2_new_grid (boolean): passed on to `read_grib()` (default: False)
+
+    Raises
+    ------
+
+    - ReadingError: if the data couldn't be read from the file
+    """
+    if data_type in _grib_data_types:
+        # Read grib with read_grib()
+        out[:] = read_grib(file, data_type, grib_var, grib_level, geogrid, yrev=yrev, debug=debug,
+                           wgrib2_new_grid=wgrib2_new_grid)
+    elif data_type in _bin_data_types:
+        # Read the record straight into out (yrev only applies to grib data)
+        read_bin(file, geogrid, record_num=record_num, out=out, debug=debug)
+
+
 def load_obs(valid_dates, file_template, data_type, geogrid, record_num=None, yrev=False,
              grib_var=None, grib_level=None, unit_conversion=None, log=False,
-             transform=None, debug=False, wgrib2_new_grid=False):
+             transform=None, debug=False, wgrib2_new_grid=False, num_workers=None):
     """
     Loads observation data
 
@@ -543,12 +1013,23 @@ def load_obs(valid_dates, file_template, data_type, geogrid, record_num=None, yr
     - transform - *string* (optional) - type of data transform to do (supported values: 'log',
       'sqare-root', None [default])
     - debug (boolean): if True the file data is loaded from will be printed out (default: False)
+    - wgrib2_new_grid (boolean): whether to regrid 10 m winds to earth-relative winds on NCEP grid
+      3 with wgrib2 before reading them (for grib2 files only, default: False)
+    - num_workers (int): maximum number of threads used to read files concurrently, which is
+      also the number of reads in flight at once - on high-latency filesystems (eg. NFS) with
+      many small files, using more workers than there are CPUs can help - if None, the
+      `concurrent.futures.ThreadPoolExecutor` default is used (default: None)
 
     Returns
     -------
 
     - Observation object containing the observation data and some QC data
 
+    Raises
+    ------
+
+    - LoadingError: if data_type is grib1 or grib2 and grib_var or grib_level isn't given
+
     Examples
     --------
 
@@ -564,6 +1045,11 @@ def load_obs(valid_dates, file_template, data_type, geogrid, record_num=None, yr
         >>> print(dataset.obs.shape, dataset.obs[:, 0])  # doctest: +SKIP
         (3, 65160) [-28.48999405 -28.04499435 -27.81749725]
     """
+    # ----------------------------------------------------------------------------------------------
+    # Make sure grib parameters are set if data_type is grib1 or grib2
+    #
+    _check_grib_params(data_type, grib_var, grib_level)
+
     # ----------------------------------------------------------------------------------------------
     # Create a new Observation Dataset
     #
@@ -572,12 +1058,16 @@ def load_obs(valid_dates, file_template, data_type, geogrid, record_num=None, yr
     # ----------------------------------------------------------------------------------------------
     # Initialize array for the Observation Dataset
     #
-    dataset.obs = np.nan * np.empty((len(valid_dates), geogrid.num_y * geogrid.num_x))
+    # Data is stored in single precision, since that's what it's read in as
+    #
+    dataset.obs = np.full((len(valid_dates), geogrid.num_y * geogrid.num_x), np.nan,
+                          dtype=np.float32)
 
     # ----------------------------------------------------------------------------------------------
     # Set dates loaded
     #
     dataset.dates_loaded |= set(valid_dates)
+    dataset.missing_date_mask = np.zeros(len(valid_dates), dtype=bool)
 
     # ----------------------------------------------------------------------------------------------
     # Create a UnitConverter object to convert the data units (if necessary) later on
@@ -588,54 +1078,39 @@ def load_obs(valid_dates, file_template, data_type, geogrid, record_num=None, yr
     # ----------------------------------------------------------------------------------------------
     # Loop over date
     #
-    for d, date in enumerate(valid_dates):
-        # Split date into components
-        yyyy, mm, dd = date[0:4], date[4:6], date[6:8]
-        if len(date) == 10:
-            hh = date[8:10]
-        else:
-            hh = '00'
-        # Replace variables in file template
-        kwargs = {'yyyy': yyyy, 'mm': mm, 'dd': dd, 'hh': hh}
-        file = jinja2.Template(os.path.expandvars(file_template)).render(**kwargs)
-        # Read in data from file
-        if data_type in ('grib1', 'grib2'):
-            try:
-                # Read grib with read_grib()
-                dataset.obs[d] = read_grib(file, data_type, grib_var, grib_level, geogrid,
-                                           yrev=yrev, debug=debug, wgrib2_new_grid=wgrib2_new_grid)
-            except ReadingError:
-                # Set this day to missing
-                dataset.obs[d] = np.full((geogrid.num_y * geogrid.num_x), np.nan)
-                # Add this date to the list of dates with files not loaded
-                dataset.dates_with_files_not_loaded.add(date)
-                # Add this file to the list of files not loaded
-                dataset.files_not_loaded.add(file)
-        elif data_type in ['bin', 'binary']:
-            try:
-                # Load data from file
-                if debug:
-                    print('Binary file being read: {}'.format(file))
-                tempdata = np.fromfile(file, dtype='float32')
-                # Determine number of records in the binary file
-                num_records = int(tempdata.size / (geogrid.num_y * geogrid.num_x))
-                # Reshape data and extract the appropriate record - if record_num is specified,
-                # extract that record number, otherwise just take the entire array
-                if record_num is not None:
-                    dataset.obs[d] = tempdata.reshape(
-                        num_records, geogrid.num_y * geogrid.num_x
-                    )[record_num]
-                else:
-                    dataset.obs[d] = tempdata.reshape(
-                        num_records, geogrid.num_y * geogrid.num_x
-                    )
-            except:
-                # Set this day to missing
-                dataset.obs[d] = np.full((geogrid.num_y * geogrid.num_x), np.nan)
-                # Add this date to the list of dates with files not loaded
-                dataset.dates_with_files_not_loaded.add(date)
-                # Add this file to the list of files not loaded
-                dataset.files_not_loaded.add(file)
+    # Each date is read in a separate thread, so the latency of reading many files is overlapped.
+    # The file template is compiled once, and rendered for every file.
+    #
+    if data_type in _file_data_types:
+        template = jinja2.Template(os.path.expandvars(file_template))
+        load_day = functools.partial(
+            _load_obs_day, data_type=data_type, geogrid=geogrid, record_num=record_num, yrev=yrev,
+            grib_var=grib_var, grib_level=grib_level, debug=debug, wgrib2_new_grid=wgrib2_new_grid
+        )
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            futures = {}
+            for d, date in enumerate(valid_dates):
+                # Split date into components
+                yyyy, mm, dd, hh = _split_date(date)
+                # Replace variables in file template
+                file = template.render(yyyy=yyyy, mm=mm, dd=dd, hh=hh)
+                # Each date's data is read straight into its row of the obs array
+                futures[executor.submit(load_day, file, dataset.obs[d])] = (d, file)
+            for future in as_completed(futures):
+                d, file = futures.pop(future)
+                try:
+                    future.result()
+                except ReadingError:
+                    # Set this day to missing
+                    dataset.obs[d] = np.full((geogrid.num_y * geogrid.num_x), np.nan)
+                    # Mark this date as having files not loaded
+                    dataset.missing_date_mask[d] = True
+                    # Add this file to the list of files not loaded
+                    dataset.files_not_loaded.add(file)
+        # Add the dates not loaded to the Dataset
+        dataset.dates_with_files_not_loaded.update(
+            valid_dates[d] for d in np.flatnonzero(dataset.missing_date_mask)
+        )
 
     # --------------------------------------------------------------------------------------
     # Convert units (if necessary)
@@ -655,7 +1130,35 @@ def load_obs(valid_dates, file_template, data_type, geogrid, record_num=None, yr
     return dataset
 
 
-def load_climos(valid_days, file_template, geogrid, num_ptiles=None, debug=False):
+def _load_climo_day(file, out):
+    """
+    Reads the climatology data for a single day into an existing array
+
+    The file is memory-mapped and copied straight into `out`, so no temporary array holding the
+    whole file is created.
+
+    Parameters
+    ----------
+
+    - file (string): file to read
+    - out (array_like): float32 array of shape (ptiles x grid points) or (grid points) to put the
+      data in - the file must contain exactly this much data
+
+    Raises
+    ------
+
+    - ReadingError: if the data couldn't be read from the file
+    """
+    try:
+        if os.path.getsize(file) != out.nbytes:
+            raise ValueError('file size doesn\'t match the expected shape {}'.format(out.shape))
+        np.copyto(out, np.memmap(file, dtype=np.float32, mode='r', shape=out.shape))
+    except (OSError, ValueError) as e:
+        raise ReadingError('Couldn\'t read climatology file: {}'.format(str(e)), file)
+
+
+def load_climos(valid_days, file_template, geogrid, num_ptiles=None, debug=False,
+                num_workers=None):
     """
     Loads climatology data
 
@@ -680,6 +1183,10 @@ def load_climos(valid_days, file_template, geogrid, num_ptiles=None, debug=False
     - num_ptiles (int or None): number of percentiles expected in the data file - if None then
     the file is assumed to be a mean or standard deviation instead of percentiles (default: None)
     - debug (boolean): if True the file data is loaded from will be printed out (default: False)
+    - num_workers (int): maximum number of threads used to read files concurrently, which is
+      also the number of reads in flight at once - on high-latency filesystems (eg. NFS) with
+      many small files, using more workers than there are CPUs can help - if None, the
+      `concurrent.futures.ThreadPoolExecutor` default is used (default: None)
 
     Returns
     -------
@@ -717,50 +1224,60 @@ def load_climos(valid_days, file_template, geogrid, num_ptiles=None, debug=False
     # ----------------------------------------------------------------------------------------------
     # Initialize array for the Climatology Dataset
     #
-    # If num_ptiles is an integer, add a ptile dimension to the climo array
+    # Data is stored in single precision, since that's what it's read in as. If num_ptiles is an
+    # integer, add a ptile dimension to the climo array
     if num_ptiles is not None:
         try:
             dataset.climo = np.full(
-                (len(valid_days), num_ptiles, geogrid.num_y * geogrid.num_x), np.nan
+                (len(valid_days), num_ptiles, geogrid.num_y * geogrid.num_x), np.nan,
+                dtype=np.float32
             )
         except:
             raise LoadingError('num_ptiles must be an integer or None')
     else:
-        dataset.climo = np.nan * np.empty((len(valid_days), geogrid.num_y * geogrid.num_x))
+        dataset.climo = np.full((len(valid_days), geogrid.num_y * geogrid.num_x), np.nan,
+                                dtype=np.float32)
 
     # ----------------------------------------------------------------------------------------------
     # Set dates loaded
     #
     dataset.dates_loaded |= set(valid_days)
+    dataset.missing_date_mask = np.zeros(len(valid_days), dtype=bool)
 
     # ----------------------------------------------------------------------------------------------
     # Loop over date
     #
-    for d, date in enumerate(valid_days):
-        # Split date into components
-        mm, dd = date[0:2], date[2:4]
-        # Replace variables in file template
-        kwargs = {'mm': mm, 'dd': dd}
-        file = jinja2.Template(os.path.expandvars(file_template)).render(**kwargs)
-        # Read in data from file
-        try:
-            # Load data from file
-            if num_ptiles is not None:
-                dataset.climo[d] = np.fromfile(file, 'float32').reshape(
-                    num_ptiles, geogrid.num_y * geogrid.num_x)
-            else:
-                dataset.climo[d] = np.fromfile(file, 'float32').reshape(
-                    geogrid.num_y * geogrid.num_x)
-        except:
-            # Set this day to missing
-            if num_ptiles:
-                dataset.climo[d] = np.full((num_ptiles, geogrid.num_y * geogrid.num_x), np.nan)
-            else:
-                dataset.climo[d] = np.full((geogrid.num_y * geogrid.num_x), np.nan)
-            # Add this date to the list of dates with files not loaded
-            dataset.dates_with_files_not_loaded.add(date)
-            # Add this file to the list of files not loaded
-            dataset.files_not_loaded.add(file)
+    # Each day is read in a separate thread, so the latency of reading many files is overlapped.
+    # The file template is compiled once, and rendered for every file.
+    #
+    template = jinja2.Template(os.path.expandvars(file_template))
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        futures = {}
+        for d, date in enumerate(valid_days):
+            # Split date into components
+            mm, dd = date[0:2], date[2:4]
+            # Replace variables in file template
+            file = template.render(mm=mm, dd=dd)
+            # Each day's data is read straight into its slice of the climo array
+            futures[executor.submit(_load_climo_day, file, dataset.climo[d])] = (d, file)
+        for future in as_completed(futures):
+            d, file = futures.pop(future)
+            try:
+                future.result()
+            except ReadingError:
+                # Set this day to missing
+                if num_ptiles:
+                    dataset.climo[d] = np.full((num_ptiles, geogrid.num_y * geogrid.num_x), np.nan)
+                else:
+                    dataset.climo[d] = np.full((geogrid.num_y * geogrid.num_x), np.nan)
+                # Mark this date as having files not loaded
+                dataset.missing_date_mask[d] = True
+                # Add this file to the list of files not loaded
+                dataset.files_not_loaded.add(file)
+    # Add the dates not loaded to the Dataset
+    dataset.dates_with_files_not_loaded.update(
+        valid_days[d] for d in np.flatnonzero(dataset.missing_date_mask)
+    )
 
     return dataset
 
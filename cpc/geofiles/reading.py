@@ -5,8 +5,15 @@ Contains methods for reading gridded data.
 # Built-ins
 import subprocess
 import uuid
+import re
 import os
 import shutil
+import hashlib
+import tempfile
+import functools
+import contextlib
+import gzip
+import bz2
 
 # Third-party
 import numpy as np
@@ -15,8 +22,176 @@ import numpy as np
 from .exceptions import ReadingError
 
 
+@functools.lru_cache(maxsize=None)
+def _which(program):
+    """
+    Returns the full path to an executable, or None if it's not installed
+
+    The result is cached, so the PATH is only searched once per program instead of once for
+    every grib record read.
+
+    ### Parameters
+
+    - program (string): name of the executable
+
+    ### Returns
+
+    - (string or None): full path to the executable
+    """
+    return shutil.which(program)
+
+
+# Functions to open compressed grib files with, by file extension
+_decompressors = {'.gz': gzip.open, '.bz2': bz2.open}
+
+
+@contextlib.contextmanager
+def _decompressed(file):
+    """
+    Context manager providing an uncompressed temporary copy of a gzip or bzip2 compressed file
+
+    The file is decompressed in chunks, so it's never held in memory all at once, and the
+    temporary copy is removed on exit.
+
+    ### Parameters
+
+    - file (string): name of the compressed file
+
+    ### Yields
+
+    - (string): name of the uncompressed temporary file
+
+    ### Raises
+
+    - ReadingError: if the file can't be decompressed
+    """
+    fd, temp_file = tempfile.mkstemp(suffix=os.path.splitext(os.path.splitext(file)[0])[1])
+    try:
+        try:
+            with os.fdopen(fd, 'wb') as f_out, \
+                    _decompressors[os.path.splitext(file)[1]](file, 'rb') as f_in:
+                shutil.copyfileobj(f_in, f_out, 1024 * 1024)
+        except Exception as e:
+            raise ReadingError('Couldn\'t decompress file: {}'.format(str(e)), file)
+        yield temp_file
+    finally:
+        os.remove(temp_file)
+
+
+def _save_cached_grib(cache_file, data, debug=False):
+    """
+    Saves a decoded grib record to a cache file
+
+    The data is written to a temp file first and then renamed, so other threads or processes never
+    see a partially-written cache file. Caching is best-effort - if the cache file can't be
+    written, the temp file is removed and the record simply isn't cached.
+
+    ### Parameters
+
+    - cache_file (string): name of the cache file
+    - data (array_like): decoded grib record
+    - debug (optional): if True, a failure to write the cache file will be printed out
+    """
+    cache_dir = os.path.dirname(cache_file)
+    temp_cache_file = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, temp_cache_file = tempfile.mkstemp(dir=cache_dir, suffix='.npy')
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, data)
+        os.replace(temp_cache_file, cache_file)
+    except OSError as e:
+        if debug:
+            print('Couldn\'t cache grib record in {}: {}'.format(cache_file, str(e)))
+        if temp_cache_file is not None:
+            try:
+                os.remove(temp_cache_file)
+            except OSError:
+                pass
+
+
+def _grib_cache_file(cache_dir, file, *args):
+    """
+    Returns the name of the cache file containing the decoded data for a grib record
+
+    The name is a hash of the grib file's path, size and modification time, as well as any other
+    arguments that affect the data returned, so a cache file is never used for a grib file that has
+    since changed.
+
+    ### Parameters
+
+    - cache_dir (string): directory containing cache files
+    - file (string): name of the grib file
+    - *args: any other values that affect the decoded data
+
+    ### Returns
+
+    - (string): name of the cache file
+    """
+    stat = os.stat(file)
+    key = repr((os.path.abspath(file), stat.st_size, stat.st_mtime_ns) + args)
+    return os.path.join(cache_dir, hashlib.sha1(key.encode()).hexdigest() + '.npy')
+
+
+def read_bin(file, geogrid, record_num=None, yrev=False, out=None, debug=False):
+    """
+    Reads a record from a flat binary (float32) file
+
+    The file is memory-mapped rather than read into a newly allocated array, so only the record
+    in question is read from disk, and the data isn't copied until it's put somewhere. If `out`
+    is given, the record is copied directly into it (flipping it in the y-direction on the way if
+    necessary), which is the only copy made.
+
+    ### Parameters
+
+    - file (string): name of the binary file to read from
+    - geogrid (Geogrid): Geogrid of the data
+    - record_num (int, optional): record to read, if the file contains several records - negative
+      values count back from the last record, as with sequence indexes - if None, the file must
+      contain exactly one record
+    - yrev (optional): option to flip the data in the y-direction
+    - out (array_like, optional): contiguous array of size (grid points) to put the record in
+    - debug (optional): if True the file being read will be printed out
+
+    ### Returns
+
+    - (array_like): a data array (grid points) containing the record - when `out` is None and yrev
+      is False this is a read-only view of the file
+
+    ### Raises
+
+    - ReadingError: if the file doesn't exist, can't be opened or doesn't contain the record
+    """
+    if debug:
+        print('Binary file being read: {}'.format(file))
+    # Make sure binary file exists first
+    if not os.path.isfile(file):
+        raise ReadingError('Binary file not found', file)
+    num_points = geogrid.num_y * geogrid.num_x
+    # Determine the number of records in the file from its size - it must be a whole number of
+    # records
+    num_records, remainder = divmod(os.path.getsize(file), num_points * 4)
+    if record_num is None:
+        if remainder or num_records != 1:
+            raise ReadingError('Binary file doesn\'t contain a single record', file)
+    elif remainder or not -num_records <= record_num < num_records:
+        raise ReadingError('Binary file doesn\'t contain record {}'.format(record_num), file)
+    try:
+        data = np.memmap(file, dtype=np.float32, mode='r', shape=(num_points,),
+                         offset=((record_num or 0) % num_records) * num_points * 4)
+    except (OSError, ValueError) as e:
+        raise ReadingError('Couldn\'t read binary file: {}'.format(str(e)), file)
+    # Flip the data in the y-dimension (if necessary) - this is just a view until it's copied
+    if yrev:
+        data = data.reshape(geogrid.num_y, geogrid.num_x)[::-1]
+    if out is None:
+        return np.ravel(data)
+    out.reshape(data.shape)[...] = data
+    return out
+
+
 def read_grib(file, grib_type, grib_var, grib_level, geogrid, yrev=False, grep_fhr=None,
-              debug=False, wgrib2_new_grid=False):
+              debug=False, wgrib2_new_grid=False, cache_dir=None):
     """
     Reads a record from a grib file
 
@@ -25,17 +200,26 @@ def read_grib(file, grib_type, grib_var, grib_level, geogrid, yrev=False, grep_f
     wgrib2 has the ability to write the record to STDIN, so no temporary file is necessary to
     read in a record from a grib2 file.
 
+    Grib files compressed with gzip (.gz) or bzip2 (.bz2) are decompressed to a temporary file
+    first.
+
     ### Parameters
 
     - file (string): name of the grib file to read from
     - grib_type (string): type of grib file ('grib1', 'grib2')
     - variable (string): name of the variable in the grib record (ex. TMP, UGRD, etc.)
     - level (string): name of the level (ex. '2 m above ground', '850 mb', etc.)
-    - geogrid (Geogrid): Geogrid the data should be placed on
+    - geogrid (Geogrid): Geogrid the data should be placed on - only its dimensions are used (to
+      flip the data when yrev is set, and to key cached records), the grid definition in the grib
+      file is never decoded
     - yrev (optional): option to flip the data in the y-direction (eg. ECMWF grib files)
     - grep_fhr (optional): fhr to grep grib file for - this is useful for gribs that may for some
       reason have duplicate records for a given variable but with different fhrs. This way you
       can get the record for the correct fhr.
+    - cache_dir (optional): directory to cache decoded records in - if set, the decoded record is
+      saved there the first time it's read, and subsequent reads of the same record (as long as
+      the grib file hasn't changed) memory-map the cached data instead of decoding the grib file
+      again. Cached data is returned as a read-only array.
 
     ### Returns
 
@@ -49,6 +233,24 @@ def read_grib(file, grib_type, grib_var, grib_level, geogrid, yrev=False, grep_f
     # Make sure grib file exists first
     if not os.path.isfile(file):
         raise ReadingError('Grib file not found', file)
+    # Use the cached record (if there is one)
+    if cache_dir is not None:
+        cache_file = _grib_cache_file(
+            cache_dir, file, grib_type, grib_var, grib_level, yrev, grep_fhr, wgrib2_new_grid,
+            getattr(geogrid, 'num_y', None), getattr(geogrid, 'num_x', None)
+        )
+        if os.path.isfile(cache_file):
+            if debug:
+                print('Reading cached grib record from {}'.format(cache_file))
+            return np.load(cache_file, mmap_mode='r')
+    # Decompress gzip/bzip2 compressed grib files to a temporary file, and read that instead
+    if os.path.splitext(file)[1] in _decompressors:
+        with _decompressed(file) as temp_grib_file:
+            data = read_grib(temp_grib_file, grib_type, grib_var, grib_level, geogrid, yrev=yrev,
+                             grep_fhr=grep_fhr, debug=debug, wgrib2_new_grid=wgrib2_new_grid)
+        if cache_dir is not None:
+            _save_cached_grib(cache_file, data, debug=debug)
+        return data
     # Generate a temporary file name
     temp_file = str(uuid.uuid4()) + '.bin'
     # Set the grep_fhr string
@@ -59,29 +261,39 @@ def read_grib(file, grib_type, grib_var, grib_level, geogrid, yrev=False, grep_f
     # Set the name of the wgrib program to call
     if grib_type == 'grib1':
         # Make sure wgrib is installed
-        if not shutil.which('wgrib'):
+        if not _which('wgrib'):
             raise ReadingError('wgrib not installed')
         wgrib_call = 'wgrib "{}" | grep ":{}:" | grep ":{}:" | grep -P "{}" | wgrib ' \
                      '-i "{}" -nh -bin -o "{}"'.format(file, grib_var, grib_level,
                                                        grep_fhr_str, file, temp_file)
     elif grib_type == 'grib2':
         # Make sure wgrib2 is installed
-        if not shutil.which('wgrib2'):
+        if not _which('wgrib2'):
             raise ReadingError('wgrib2 not installed')
         # Note that the binary data is written to stdout
         if wgrib2_new_grid and grib_var in ['UGRD', 'VGRD']:
-            grib_file = 'temp.grb2'
+            # Use a unique name for the regridded file, so concurrent reads don't overwrite (or
+            # remove) each other's
+            grib_file = str(uuid.uuid4()) + '.grb2'
             wgrib_extra_before = (
                 f'wgrib2 -match "GRD:10 m" {file} -new_grid_winds earth -new_grid ncep grid 3 '
                 f'{grib_file} > /dev/null ;')
         else:
             wgrib_extra_before = ''
             grib_file = file
-        wgrib_call = (
-            f'{wgrib_extra_before} '
-            f'wgrib2 "{grib_file}" -match "{grib_var}" -match "{grib_level}" -match '
-            f'"{grep_fhr_str}" '
-            f'-end -order we:sn -no_header -inv /dev/null -bin - ')
+        if wgrib_extra_before:
+            wgrib_call = (
+                f'{wgrib_extra_before} '
+                f'wgrib2 "{grib_file}" -match "{grib_var}" -match "{grib_level}" -match '
+                f'"{grep_fhr_str}" '
+                f'-end -order we:sn -no_header -inv /dev/null -bin - ')
+        else:
+            # Nothing needs to run first, so wgrib2 can be run directly instead of through a shell
+            wgrib_call = [
+                _which('wgrib2'), grib_file, '-match', grib_var, '-match', grib_level, '-match',
+                grep_fhr_str, '-end', '-order', 'we:sn', '-no_header', '-inv', '/dev/null', '-bin',
+                '-'
+            ]
     else:
         raise ReadingError(__name__ + ' requires grib_type to be grib1 or grib2')
     if debug:
@@ -92,8 +304,8 @@ def read_grib(file, grib_type, grib_var, grib_level, geogrid, yrev=False, grep_f
             output = subprocess.call(wgrib_call, shell=True, stderr=subprocess.DEVNULL,
                                      stdout=subprocess.DEVNULL)
         else:
-            proc = subprocess.Popen(wgrib_call, shell=True, stderr=subprocess.DEVNULL,
-                                    stdout=subprocess.PIPE)
+            proc = subprocess.Popen(wgrib_call, shell=isinstance(wgrib_call, str),
+                                    stderr=subprocess.DEVNULL, stdout=subprocess.PIPE)
     except Exception as e:
         if grib_type == 'grib1':
             os.remove(temp_file)
@@ -102,16 +314,26 @@ def read_grib(file, grib_type, grib_var, grib_level, geogrid, yrev=False, grep_f
     if grib_type == 'grib1':
         data = np.fromfile(temp_file, dtype=np.float32)
     else:
-        data = np.frombuffer(bytearray(proc.stdout.read()), dtype='float32')
-    if data.size == 0:
-        raise ReadingError('No grib record found')
-    # Delete the temporary file
+        # Read the record straight into a float32 array the size of the grid, and wait for wgrib2
+        # to finish
+        num_points = getattr(geogrid, 'num_y', 0) * getattr(geogrid, 'num_x', 0)
+        data = np.empty(num_points, dtype=np.float32)
+        with proc:
+            num_bytes = proc.stdout.readinto(data)
+            extra = proc.stdout.read()
+        if num_bytes < data.nbytes or extra:
+            # The record isn't the size of the grid, so return it as it is
+            data = np.frombuffer(bytearray(data.tobytes()[:num_bytes] + extra), dtype=np.float32)
+    # Delete the temporary files
     if grib_type == 'grib1':
         os.remove(temp_file)
-    try:
-        os.remove('temp.grb2', )
-    except:
-        pass
+    elif grib_file != file:
+        try:
+            os.remove(grib_file)
+        except FileNotFoundError:
+            pass
+    if data.size == 0:
+        raise ReadingError('No grib record found')
     # Flip the data in the y-dimension (if necessary)
     if yrev:
         # Reshape into 2 dimensions
@@ -123,5 +345,148 @@ def read_grib(file, grib_type, grib_var, grib_level, geogrid, yrev=False, grep_f
         data = np.flipud(data)
         # Reshape back into 1 dimension
         data = np.reshape(data, data.size)
+    # Cache the decoded record
+    if cache_dir is not None:
+        _save_cached_grib(cache_file, data, debug=debug)
+    # Return data
+    return data
+
+
+def read_grib_multi(file, grib_type, grib_var, grib_level, geogrid, grep_fhrs, yrev=False,
+                    debug=False, cache_dir=None):
+    """
+    Reads one record per fhr of a variable from a grib file in a single pass
+
+    `read_grib()` runs wgrib/wgrib2 over the entire grib file for every record it reads. When a
+    grib file contains records for several fhrs, this function instead runs wgrib/wgrib2 once,
+    writing all of the matching records along with their inventory, and then uses the inventory
+    to match the records to the fhrs.
+
+    Like `read_grib()`, gzip (.gz) and bzip2 (.bz2) compressed grib files are decompressed to a
+    temporary file first.
+
+    ### Parameters
+
+    - file (string): name of the grib file to read from
+    - grib_type (string): type of grib file ('grib1', 'grib2')
+    - grib_var (string): name of the variable in the grib record (ex. TMP, UGRD, etc.)
+    - grib_level (string): name of the level (ex. '2 m above ground', '850 mb', etc.)
+    - geogrid (Geogrid): Geogrid the data should be placed on
+    - grep_fhrs (list of strings): fhrs to grep the grib file for (see the `grep_fhr` parameter
+      of `read_grib()`)
+    - yrev (optional): option to flip the data in the y-direction (eg. ECMWF grib files)
+    - cache_dir (optional): directory to cache decoded records in - each fhr's record is cached
+      separately, under the same name `read_grib()` caches it under when given that fhr as
+      `grep_fhr`, and only the fhrs that aren't cached yet are decoded
+
+    ### Returns
+
+    - (array_like): a data array of shape (len(grep_fhrs), grid points) containing the record
+      matching each fhr
+
+    ### Raises
+
+    - ReadingError: if wgrib has a problem reading the grib and/or writing the temp files
+    - ReadingError: if no grib record, or more than one, is found for one of the fhrs
+    """
+    # Make sure grib file exists first
+    if not os.path.isfile(file):
+        raise ReadingError('Grib file not found', file)
+    # Use the cached records (if there are any), and only decode the fhrs that aren't cached
+    if cache_dir is not None:
+        cache_files = [
+            _grib_cache_file(
+                cache_dir, file, grib_type, grib_var, grib_level, yrev, grep_fhr, False,
+                getattr(geogrid, 'num_y', None), getattr(geogrid, 'num_x', None)
+            ) for grep_fhr in grep_fhrs
+        ]
+        uncached = [i for i, cache_file in enumerate(cache_files)
+                    if not os.path.isfile(cache_file)]
+        records = {}
+        if uncached:
+            data = read_grib_multi(file, grib_type, grib_var, grib_level, geogrid,
+                                   [grep_fhrs[i] for i in uncached], yrev=yrev, debug=debug)
+            for i, record in zip(uncached, data):
+                _save_cached_grib(cache_files[i], record, debug=debug)
+                records[i] = record
+        if debug and len(records) < len(cache_files):
+            print('Reading cached grib records from {}'.format(cache_dir))
+        return np.stack([records[i] if i in records else np.load(cache_files[i], mmap_mode='r')
+                         for i in range(len(cache_files))])
+    # Decompress gzip/bzip2 compressed grib files to a temporary file, and read that instead
+    if os.path.splitext(file)[1] in _decompressors:
+        with _decompressed(file) as temp_grib_file:
+            return read_grib_multi(temp_grib_file, grib_type, grib_var, grib_level, geogrid,
+                                   grep_fhrs, yrev=yrev, debug=debug)
+    # Generate temporary file names for the data (grib1 only) and the inventory
+    temp_file = str(uuid.uuid4()) + '.bin'
+    inv_file = str(uuid.uuid4()) + '.inv'
+    # Match any of the fhrs
+    grep_fhrs_str = '({})'.format('|'.join(grep_fhrs))
+    # Set the name of the wgrib program to call
+    if grib_type == 'grib1':
+        # Make sure wgrib is installed
+        if not _which('wgrib'):
+            raise ReadingError('wgrib not installed')
+        wgrib_call = 'wgrib "{}" | grep ":{}:" | grep ":{}:" | grep -P "{}" | tee "{}" | wgrib ' \
+                     '-i "{}" -nh -bin -o "{}"'.format(file, grib_var, grib_level, grep_fhrs_str,
+                                                       inv_file, file, temp_file)
+    elif grib_type == 'grib2':
+        # Make sure wgrib2 is installed
+        if not _which('wgrib2'):
+            raise ReadingError('wgrib2 not installed')
+        # Note that the binary data is written to stdout
+        wgrib_call = [
+            _which('wgrib2'), file, '-match', grib_var, '-match', grib_level, '-match',
+            grep_fhrs_str, '-order', 'we:sn', '-no_header', '-inv', inv_file, '-bin', '-'
+        ]
+    else:
+        raise ReadingError(__name__ + ' requires grib_type to be grib1 or grib2')
+    if debug:
+        print('wgrib command: {}'.format(wgrib_call))
+    # Generate a wgrib call, and read in the binary data and the inventory
+    try:
+        if grib_type == 'grib1':
+            subprocess.call(wgrib_call, shell=True, stderr=subprocess.DEVNULL,
+                            stdout=subprocess.DEVNULL)
+            data = np.fromfile(temp_file, dtype=np.float32)
+        else:
+            proc = subprocess.run(wgrib_call, stderr=subprocess.DEVNULL, stdout=subprocess.PIPE)
+            data = np.frombuffer(proc.stdout, dtype=np.float32)
+        with open(inv_file) as f:
+            inventory = f.read().splitlines()
+    except Exception as e:
+        raise ReadingError('Couldn\'t read {} file: {}'.format(grib_type, str(e)), file)
+    finally:
+        # Delete the temporary files
+        for temp in (temp_file, inv_file):
+            if os.path.isfile(temp):
+                os.remove(temp)
+    if data.size == 0 or not inventory or data.size % len(inventory) != 0:
+        raise ReadingError('No grib record found', file)
+    # Match each fhr to the record in the inventory containing it - like `read_grib()`, an fhr
+    # matching more than one record is an error rather than silently picking one of them
+    records = np.reshape(data, (len(inventory), -1))
+    indexes = []
+    for grep_fhr in grep_fhrs:
+        matches = [i for i, line in enumerate(inventory) if re.search(grep_fhr, line)]
+        if not matches:
+            raise ReadingError('No grib record found for fhr {}'.format(grep_fhr), file)
+        if len(matches) > 1:
+            raise ReadingError('More than one grib record found for fhr {}'.format(grep_fhr),
+                               file)
+        indexes.append(matches[0])
+    data = records[indexes]
+    # Flip the data in the y-dimension (if necessary)
+    if yrev:
+        # Reshape into 3 dimensions
+        try:
+            data = np.reshape(data, (len(indexes), geogrid.num_y, geogrid.num_x))
+        except AttributeError:
+            raise ValueError('The yrev parameter requires that the geogrid parameter be defined')
+        # Flip
+        data = data[:, ::-1]
+        # Reshape back into 2 dimensions
+        data = np.reshape(data, (len(indexes), -1))
     # Return data
     return data
@@ -0,0 +1,34 @@
+import numpy as np
+
+from cpc.geofiles.datasets import EnsembleForecast
+
+
+def test_ens_mean_ignores_nans():
+    ens = np.array([[[1, 2], [3, np.nan]], [[np.nan, np.nan], [5, np.nan]]], dtype=np.float32)
+    dataset = EnsembleForecast(ens=ens)
+    np.testing.assert_array_equal(dataset.ens_mean, np.array([[2, 2], [5, np.nan]]))
+    assert dataset.ens_mean.dtype == np.float32
+
+
+def test_ens_spread_of_float16_ens_doesnt_overflow():
+    ens = np.array([[[0, np.nan], [600, 600]]], dtype=np.float16)
+    dataset = EnsembleForecast(ens=ens)
+    np.testing.assert_array_equal(dataset.ens_spread, np.array([[300, 0]]))
+    assert dataset.ens_spread.dtype == np.float32
+
+
+def test_ens_mean_is_cached_until_invalidated():
+    dataset = EnsembleForecast(ens=np.ones((2, 3, 4)))
+    ens_mean = dataset.ens_mean
+    assert dataset.ens_mean is ens_mean
+    dataset.ens[:] = 2
+    assert dataset.ens_mean is ens_mean
+    dataset.invalidate_ens_mean()
+    np.testing.assert_array_equal(dataset.ens_mean, np.full((2, 4), 2))
+
+
+def test_setting_ens_invalidates_ens_mean():
+    dataset = EnsembleForecast(ens=np.ones((2, 3, 4)))
+    dataset.ens_mean
+    dataset.ens = np.zeros((2, 3, 4))
+    np.testing.assert_array_equal(dataset.ens_mean, np.zeros((2, 4)))
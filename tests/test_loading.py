@@ -0,0 +1,215 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from cpc.geofiles import reading
+from cpc.geofiles.loading import (all_int_to_str, _mean_std, load_dtrm_fcsts, load_ens_fcsts,
+                                  load_obs)
+
+
+def test_all_int_to_str_zero_pads_to_longest_int():
+    assert all_int_to_str(range(0, 126, 6))[:3] == ['000', '006', '012']
+    assert all_int_to_str([-5, 10]) == ['-5', '10']
+
+
+def test_all_int_to_str_leaves_strings_alone():
+    assert all_int_to_str(['0', '06']) == ['0', '06']
+
+
+@pytest.mark.parametrize('input', [[0, '06'], [0.0, 6.0]])
+def test_all_int_to_str_rejects_non_ints(input):
+    with pytest.raises(ValueError):
+        all_int_to_str(input)
+
+
+# --------------------------------------------------------------------------------------------------
+# Loading binary forecasts and observations
+#
+geogrid = SimpleNamespace(num_y=2, num_x=2)
+dates = ['20160101', '20160102']
+members = ['1', '2']
+fhrs = ['06', '12', '18']
+
+
+@pytest.fixture
+def fcst_data(tmp_path):
+    # One binary file per date, member and fhr - returns the (dates x members x fhrs x grid points)
+    # data they contain
+    rng = np.random.default_rng(0)
+    data = rng.random((len(dates), len(members), len(fhrs), 4), dtype=np.float32)
+    for d, date in enumerate(dates):
+        for m, member in enumerate(members):
+            for f, fhr in enumerate(fhrs):
+                data[d, m, f].tofile(tmp_path / f'f_{date}_m{member}_f{fhr}.bin')
+    return data
+
+
+def fcst_template(tmp_path, member='{{member}}', fhr='{{fhr}}'):
+    return str(tmp_path / f'f_{{{{yyyy}}}}{{{{mm}}}}{{{{dd}}}}_m{member}_f{fhr}.bin')
+
+
+@pytest.mark.parametrize('fhr_stat, func', [('mean', np.mean), ('min', np.min), ('max', np.max),
+                                            ('sum', np.sum)])
+def test_load_ens_fcsts_takes_stat_over_fhrs(tmp_path, fcst_data, fhr_stat, func):
+    dataset = load_ens_fcsts(dates, fhrs, members, fcst_template(tmp_path), 'bin', geogrid,
+                             fhr_stat=fhr_stat)
+    np.testing.assert_allclose(dataset.ens, func(fcst_data, axis=2), rtol=1e-6)
+    assert not dataset.missing_date_mask.any()
+    assert dataset.dates_loaded == set(dates)
+
+
+def test_load_ens_fcsts_keeps_every_fhr_without_fhr_stat(tmp_path, fcst_data):
+    dataset = load_ens_fcsts(dates, fhrs, members, fcst_template(tmp_path), 'bin', geogrid,
+                             fhr_stat=None)
+    np.testing.assert_array_equal(dataset.ens, fcst_data.transpose(2, 0, 1, 3))
+
+
+def test_load_ens_fcsts_single_fhr_is_its_own_stat(tmp_path, fcst_data):
+    dataset = load_ens_fcsts(dates, fhrs[1:2], members, fcst_template(tmp_path), 'bin', geogrid,
+                             fhr_stat='mean')
+    np.testing.assert_array_equal(dataset.ens, fcst_data[:, :, 1])
+
+
+def test_load_ens_fcsts_accum_over_fhr_is_last_minus_first(tmp_path, fcst_data):
+    dataset = load_ens_fcsts(dates, fhrs, members, fcst_template(tmp_path), 'bin', geogrid,
+                             fhr_stat='sum', accum_over_fhr=True)
+    np.testing.assert_allclose(dataset.ens, fcst_data[:, :, -1] - fcst_data[:, :, 0])
+
+
+def test_load_ens_fcsts_accum_over_fhr_only_reads_first_and_last_fhrs(tmp_path, fcst_data):
+    (tmp_path / f'f_{dates[1]}_m2_f12.bin').unlink()
+    dataset = load_ens_fcsts(dates, fhrs, members, fcst_template(tmp_path), 'bin', geogrid,
+                             fhr_stat='sum', accum_over_fhr=True)
+    np.testing.assert_allclose(dataset.ens, fcst_data[:, :, -1] - fcst_data[:, :, 0])
+    assert not dataset.missing_date_mask.any()
+    assert dataset.files_not_loaded == set()
+
+
+def test_load_ens_fcsts_stops_reading_day_at_missing_fhr(tmp_path, fcst_data):
+    for fhr in fhrs[1:]:
+        (tmp_path / f'f_{dates[1]}_m2_f{fhr}.bin').unlink()
+    dataset = load_ens_fcsts(dates, fhrs, members, fcst_template(tmp_path), 'bin', geogrid)
+    # The stat is missing, and the files after the first missing one aren't read
+    assert np.isnan(dataset.ens[1, 1]).all()
+    np.testing.assert_allclose(dataset.ens[:, 0], fcst_data[:, 0].mean(axis=1), rtol=1e-6)
+    assert dataset.files_not_loaded == {str(tmp_path / f'f_{dates[1]}_m2_f12.bin')}
+    assert dataset.missing_date_mask.tolist() == [False, True]
+    assert dataset.dates_with_files_not_loaded == {dates[1]}
+
+
+def test_load_ens_fcsts_copies_members_without_member_in_template(tmp_path, fcst_data):
+    dataset = load_ens_fcsts(dates, fhrs, members, fcst_template(tmp_path, member='1'), 'bin',
+                             geogrid, fhr_stat='max')
+    for m in range(len(members)):
+        np.testing.assert_array_equal(dataset.ens[:, m], fcst_data[:, 0].max(axis=1))
+
+
+def test_load_ens_fcsts_reads_file_once_without_fhr_in_template(tmp_path, fcst_data):
+    dataset = load_ens_fcsts(dates, fhrs, members, fcst_template(tmp_path, fhr='06'), 'bin',
+                             geogrid, fhr_stat='sum')
+    # Every fhr gets the same record
+    np.testing.assert_allclose(dataset.ens, fcst_data[:, :, 0] * len(fhrs), rtol=1e-6)
+
+
+def test_load_dtrm_fcsts_takes_std_over_fhrs(tmp_path, fcst_data):
+    dataset = load_dtrm_fcsts(dates, fhrs, fcst_template(tmp_path, member='1'), 'bin', geogrid,
+                              fhr_stat='std')
+    np.testing.assert_allclose(dataset.fcst, fcst_data[:, 0].std(axis=1), rtol=1e-5)
+
+
+def test_mean_std_matches_numpy():
+    rows = np.random.default_rng(1).normal(10, 3, (7, 50))
+    mean, std = _mean_std(iter(rows))
+    np.testing.assert_allclose(mean, rows.mean(axis=0))
+    np.testing.assert_allclose(std, rows.std(axis=0))
+
+
+def test_mean_std_propagates_nans():
+    rows = np.array([[1, 2], [np.nan, 4], [5, 6]])
+    mean, std = _mean_std(rows)
+    assert np.isnan(mean[0]) and np.isnan(std[0])
+    assert mean[1] == 4 and std[1] == pytest.approx(np.std([2, 4, 6]))
+
+
+@pytest.mark.parametrize('record_num, expected_record', [(1, 1), (-1, 2)])
+def test_load_obs_reads_requested_record(tmp_path, record_num, expected_record):
+    data = np.arange(len(dates) * 3 * 4, dtype=np.float32).reshape(len(dates), 3, 4)
+    for d, date in enumerate(dates):
+        data[d].tofile(tmp_path / f'o_{date}.bin')
+    # The second date's file doesn't contain whole records, so it isn't loaded
+    with open(tmp_path / f'o_{dates[1]}.bin', 'ab') as f:
+        f.write(b'\0\0\0\0')
+    dataset = load_obs(dates, str(tmp_path / 'o_{{yyyy}}{{mm}}{{dd}}.bin'), 'bin', geogrid,
+                       record_num=record_num)
+    np.testing.assert_array_equal(dataset.obs[0], data[0, expected_record])
+    assert np.isnan(dataset.obs[1]).all()
+    assert dataset.missing_date_mask.tolist() == [False, True]
+    assert dataset.files_not_loaded == {str(tmp_path / f'o_{dates[1]}.bin')}
+
+
+# --------------------------------------------------------------------------------------------------
+# Loading grib forecasts
+#
+# The grib "files" are wgrib2 inventories, one record per line, and the fake wgrib2 writes the
+# records matching every -match pattern (only the first with -end) - each record's grid points
+# are all set to the number after "val=" in its inventory line
+#
+fake_wgrib2_source = """\
+import re, sys
+import numpy as np
+args = sys.argv[1:]
+patterns = [args[i + 1] for i, arg in enumerate(args) if arg == '-match']
+inv_file = args[args.index('-inv') + 1]
+with open(args[0]) as f:
+    lines = [line for line in f.read().splitlines() if all(re.search(p, line) for p in patterns)]
+if '-end' in args:
+    lines = lines[:1]
+with open(inv_file, 'w') as f:
+    f.write(''.join(line + '\\n' for line in lines))
+for line in lines:
+    value = float(re.search('val=([0-9.]+)', line).group(1))
+    sys.stdout.buffer.write(np.full(4, value, dtype=np.float32).tobytes())
+"""
+
+
+@pytest.fixture
+def fake_wgrib2(tmp_path, monkeypatch):
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    wgrib2 = bin_dir / 'wgrib2'
+    wgrib2.write_text(f'#!{sys.executable}\n' + fake_wgrib2_source)
+    wgrib2.chmod(0o755)
+    monkeypatch.setenv('PATH', str(bin_dir) + os.pathsep + os.environ['PATH'])
+    reading._which.cache_clear()
+    yield
+    reading._which.cache_clear()
+
+
+@pytest.fixture
+def grib_file(tmp_path):
+    # The date contains '12' and '120', and the records for fhrs 12 and 120 both contain '12'
+    file = tmp_path / 'f_20161212.grb2'
+    file.write_text(''.join(
+        f'{i + 1}:0:d=2016121200:TMP:2 m above ground:{fhr} hour fcst:val={val}\n'
+        for i, (fhr, val) in enumerate([(6, 1), (12, 10), (120, 100)])
+    ))
+    return str(tmp_path / 'f_{{yyyy}}{{mm}}{{dd}}.grb2')
+
+
+def test_load_ens_fcsts_greps_grib_for_each_fhr(fake_wgrib2, grib_file):
+    dataset = load_ens_fcsts(['20161212'], [6, 12], [1], grib_file, 'grib2', geogrid,
+                             fhr_stat=None, grib_var='TMP', grib_level='2 m above ground',
+                             remove_dup_grib_fhrs=True)
+    np.testing.assert_array_equal(dataset.ens[:, 0, 0], [[1] * 4, [10] * 4])
+    assert dataset.files_not_loaded == set()
+
+
+@pytest.mark.parametrize('fhrs, expected', [([6, 12, 120], 37), ([12], 10), ([120], 100)])
+def test_load_dtrm_fcsts_greps_grib_for_each_fhr(fake_wgrib2, grib_file, fhrs, expected):
+    dataset = load_dtrm_fcsts(['20161212'], fhrs, grib_file, 'grib2', geogrid, grib_var='TMP',
+                              grib_level='2 m above ground', remove_dup_grib_fhrs=True)
+    np.testing.assert_allclose(dataset.fcst, [[expected] * 4])
+    assert dataset.files_not_loaded == set()
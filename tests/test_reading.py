@@ -0,0 +1,113 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from cpc.geofiles import reading
+from cpc.geofiles.exceptions import ReadingError
+from cpc.geofiles.reading import read_bin
+
+geogrid = SimpleNamespace(num_y=2, num_x=3)
+
+
+def test_read_bin_flips_into_out(tmp_path):
+    file = tmp_path / 'data.bin'
+    np.arange(6, dtype=np.float32).tofile(file)
+    out = np.empty(6, dtype=np.float32)
+    assert read_bin(str(file), geogrid, yrev=True, out=out) is out
+    np.testing.assert_array_equal(out, [3, 4, 5, 0, 1, 2])
+
+
+def test_read_bin_raises_reading_error_when_file_cant_be_opened(tmp_path, monkeypatch):
+    file = tmp_path / 'data.bin'
+    np.arange(6, dtype=np.float32).tofile(file)
+
+    def memmap(*args, **kwargs):
+        raise PermissionError(13, 'Permission denied')
+
+    monkeypatch.setattr(reading.np, 'memmap', memmap)
+    with pytest.raises(ReadingError) as e:
+        read_bin(str(file), geogrid)
+    assert e.value.file == str(file)
+
+
+@pytest.mark.parametrize('record_num, expected', [(0, [0, 1, 2, 3, 4, 5]),
+                                                  (2, [12, 13, 14, 15, 16, 17]),
+                                                  (-1, [12, 13, 14, 15, 16, 17])])
+def test_read_bin_reads_requested_record(tmp_path, record_num, expected):
+    file = tmp_path / 'data.bin'
+    np.arange(18, dtype=np.float32).tofile(file)
+    np.testing.assert_array_equal(read_bin(str(file), geogrid, record_num=record_num), expected)
+
+
+@pytest.mark.parametrize('size, record_num', [(18, None), (18, 3), (18, -4), (8, 0)])
+def test_read_bin_rejects_missing_records(tmp_path, size, record_num):
+    file = tmp_path / 'data.bin'
+    np.arange(size, dtype=np.float32).tofile(file)
+    with pytest.raises(ReadingError):
+        read_bin(str(file), geogrid, record_num=record_num)
+
+
+@pytest.fixture
+def fake_wgrib2(tmp_path, monkeypatch):
+    # A wgrib2 that writes the records 0..5 and 6..11 to stdout (and an inventory, if asked for)
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    wgrib2 = bin_dir / 'wgrib2'
+    wgrib2.write_text(
+        '#!/bin/sh\n'
+        'while [ $# -gt 0 ]; do\n'
+        '    if [ "$1" = "-inv" ] && [ "$2" != /dev/null ]; then\n'
+        '        printf "1:0:d=2016010100:TMP:2 m above ground:6 hour fcst:\\n'
+        '2:0:d=2016010100:TMP:2 m above ground:12 hour fcst:\\n" > "$2"\n'
+        '    fi\n'
+        '    shift\n'
+        'done\n'
+        '{} -c "import sys, numpy; '
+        'sys.stdout.buffer.write(numpy.arange(12, dtype=numpy.float32).tobytes())"\n'
+        .format(sys.executable)
+    )
+    wgrib2.chmod(0o755)
+    monkeypatch.setenv('PATH', str(bin_dir) + os.pathsep + os.environ['PATH'])
+    reading._which.cache_clear()
+    yield
+    reading._which.cache_clear()
+
+
+def test_read_grib_returns_data_when_cache_cant_be_written(tmp_path, fake_wgrib2):
+    grib_file = tmp_path / 'data.grb2'
+    grib_file.touch()
+    # The cache directory can't be created under a regular file
+    cache_dir = str(grib_file / 'cache')
+    data = reading.read_grib(str(grib_file), 'grib2', 'TMP', '2 m above ground',
+                             SimpleNamespace(num_y=2, num_x=6), cache_dir=cache_dir)
+    np.testing.assert_array_equal(data, np.arange(12))
+    data = reading.read_grib_multi(str(grib_file), 'grib2', 'TMP', '2 m above ground', geogrid,
+                                   [':6 hour', ':12 hour'], cache_dir=cache_dir)
+    np.testing.assert_array_equal(data, np.arange(12).reshape(2, 6))
+
+
+def test_read_grib_removes_temp_file_when_cache_cant_be_written(tmp_path, fake_wgrib2,
+                                                                monkeypatch):
+    grib_file = tmp_path / 'data.grb2'
+    grib_file.touch()
+    cache_dir = tmp_path / 'cache'
+
+    def save(*args, **kwargs):
+        raise OSError(28, 'No space left on device')
+
+    monkeypatch.setattr(reading.np, 'save', save)
+    data = reading.read_grib(str(grib_file), 'grib2', 'TMP', '2 m above ground',
+                             SimpleNamespace(num_y=2, num_x=6), cache_dir=str(cache_dir))
+    np.testing.assert_array_equal(data, np.arange(12))
+    assert list(cache_dir.iterdir()) == []
+
+
+def test_read_grib_multi_rejects_fhr_matching_several_records(tmp_path, fake_wgrib2):
+    grib_file = tmp_path / 'data.grb2'
+    grib_file.touch()
+    with pytest.raises(ReadingError):
+        reading.read_grib_multi(str(grib_file), 'grib2', 'TMP', '2 m above ground', geogrid,
+                                [':6 hour', 'd=2016010100'])